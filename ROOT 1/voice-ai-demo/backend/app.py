@@ -1,16 +1,81 @@
-from flask import Flask, request, jsonify
-from services.audio_service import AudioService
-from services.transcription_service import TranscriptionService
-from services.ai_service import AIService
-from services.search_service import SearchService
+import os
+import sys
+import tempfile
+import time
+
+from flask import Flask, request, jsonify, Response, stream_with_context, g
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+# Services import each other by module name, so they are loaded from their own directory;
+# importing them as services.* as well would create a second copy of each module
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "services"))
+
+from audio_service import AudioService
+from transcription_service import TranscriptionService
+from ai_service import AIService
+from search_service import SearchService
+from models import Base
+from query_log import default_writer, profile_query, report_since_minutes
+from tracing import registry, RequestProfiler
+from utils.helpers import handle_error, ndjson_lines, serialize_transcription
+
+# Import the speech-to-text model with error handling; /api/transcribe answers 503 without it
+try:
+    import whisper
+    WHISPER_AVAILABLE = True
+except ImportError:
+    WHISPER_AVAILABLE = False
 
 app = Flask(__name__)
 
+# Database: services share a thread-local session per request; the query log
+# writer opens its own sessions from the same factory
+DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///voice_ai.db")
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+)
+Base.metadata.create_all(engine)
+SessionFactory = sessionmaker(bind=engine)
+db_session = scoped_session(SessionFactory)
+default_writer.configure(SessionFactory)
+
 # Initialize services
+# AI_MODEL_TYPE selects the AIService backend; the OpenAI backend needs OPENAI_API_KEY and
+# honours OPENAI_API_BASE for local OpenAI-compatible servers
 audio_service = AudioService()
-transcription_service = TranscriptionService()
-ai_service = AIService()
-search_service = SearchService()
+transcription_service = TranscriptionService(
+    whisper.load_model(os.environ.get("WHISPER_MODEL", "base")) if WHISPER_AVAILABLE else None
+)
+ai_service = AIService(
+    db_session,
+    model_type=os.environ.get("AI_MODEL_TYPE", "openai"),
+    api_key=os.environ.get("OPENAI_API_KEY")
+)
+search_service = SearchService(db_session)
+request_profiler = RequestProfiler()
+
+@app.teardown_appcontext
+def remove_db_session(exception=None):
+    db_session.remove()
+
+@app.before_request
+def start_request_span():
+    g.request_start = time.perf_counter()
+    g.profiler = request_profiler.start() if request_profiler.should_profile(request.headers) else None
+
+@app.after_request
+def finish_request_span(response):
+    if getattr(g, "profiler", None) is not None:
+        profile_path = request_profiler.stop(g.profiler, request.endpoint or "unknown")
+        if profile_path:
+            response.headers["X-Profile-File"] = profile_path
+    if hasattr(g, "request_start"):
+        # Streaming responses are timed up to the first byte only
+        registry.observe(f"http {request.method} {request.url_rule or 'unmatched'}",
+                         time.perf_counter() - g.request_start, response.status_code >= 500)
+    return response
 
 @app.route('/api/record', methods=['POST'])
 def record_audio():
@@ -20,21 +85,73 @@ def record_audio():
 
 @app.route('/api/transcribe', methods=['POST'])
 def transcribe_audio():
+    if transcription_service.model is None:
+        return jsonify(handle_error("Transcription model not available. Install with: pip install whisper-openai")), 503
     audio_file = request.files['file']
-    transcription = transcription_service.transcribe(audio_file)
+    with tempfile.NamedTemporaryFile(suffix=os.path.splitext(audio_file.filename or "")[1]) as upload:
+        audio_file.save(upload.name)
+        transcription = transcription_service.transcribe_audio(upload.name)
+    # whisper returns the text along with its segments
+    if isinstance(transcription, dict):
+        transcription = transcription.get("text", "").strip()
     return jsonify({"transcription": transcription}), 200
 
 @app.route('/api/query', methods=['POST'])
 def query_ai():
-    user_query = request.json.get('query')
-    response = ai_service.process_query(user_query)
-    return jsonify({"response": response}), 200
+    user_query = (request.get_json(silent=True) or {}).get('query')
+    if not isinstance(user_query, str) or not user_query.strip():
+        return jsonify(handle_error("A non-empty 'query' string is required")), 400
+    with profile_query(user_query, "api.query") as profile:
+        response = ai_service.process_query(user_query)
+        with profile.stage("serialization"):
+            body = jsonify({"response": response})
+    return body, 200
 
 @app.route('/api/search', methods=['GET'])
 def search_transcriptions():
     query = request.args.get('query')
-    results = search_service.search(query)
-    return jsonify({"results": results}), 200
+    cursor = request.args.get('cursor')
+
+    # NDJSON mode streams rows as the DB cursor yields them instead of building one response
+    if request.args.get('stream') == 'ndjson' or request.accept_mimetypes.best == 'application/x-ndjson':
+        try:
+            rows = search_service.iter_transcriptions(query, {"cursor": cursor})
+        except ValueError as e:
+            return jsonify(handle_error(str(e))), 400
+        return Response(stream_with_context(ndjson_lines(rows, serialize_transcription)),
+                        mimetype='application/x-ndjson')
+
+    with profile_query(query, "api.search") as profile:
+        try:
+            page = search_service.advanced_search(query, {
+                "sort": "recency",
+                "cursor": cursor,
+                "limit": request.args.get('limit', type=int)
+            })
+        except ValueError as e:
+            return jsonify(handle_error(str(e))), 400
+
+        with profile.stage("serialization"):
+            body = jsonify({
+                "results": [serialize_transcription(trans) for trans in page["results"]],
+                "next_cursor": page["next_cursor"],
+                "has_more": page["has_more"]
+            })
+    return body, 200
+
+@app.route('/api/metrics/queries', methods=['GET'])
+def query_latency_report():
+    report = report_since_minutes(
+        search_service.db_session,
+        request.args.get('minutes', type=int),
+        source=request.args.get('source'),
+        slowest=request.args.get('slowest', 10, type=int)
+    )
+    return jsonify(report), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(registry.render_prometheus(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
@@ -0,0 +1,195 @@
+"""
+Accuracy and latency comparison of the CPU inference backends
+
+Runs the same summarization and question-answering inputs through the default
+"huggingface" pipelines and the "quantized" and "onnx" backends. Reports load
+time, per-call latency, memory and agreement with the default backend: ROUGE-1/ROUGE-L
+F1 for summaries, exact match and token F1 for answers. Each backend runs in its own
+process so peak memory is measured per backend.
+
+Usage:
+    python benchmarks/compare_cpu_backends.py --backends huggingface quantized onnx --output cpu.json
+    python benchmarks/compare_cpu_backends.py --texts transcripts.jsonl   # {"text": ..., "question": ...} lines
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services")
+sys.path.insert(0, SERVICES_DIR)
+
+from cpu_inference import CPU_BACKENDS, QA_MODEL, SUMMARIZATION_MODEL, load_cpu_pipelines
+
+SAMPLES = [
+    {
+        "text": (
+            "Okay so let's get started with the quarterly planning meeting. Alice Smith opened by reviewing "
+            "the budget, which came in about ten percent under forecast because the hiring plan slipped by "
+            "a month. Bob Jones said the mobile release is still on track for March 15, 2024, but the payment "
+            "migration is the main risk and needs two more engineers. We agreed to move Carol from the data "
+            "team onto the migration for six weeks. Marketing wants the launch announcement drafted by the end "
+            "of February. Action items: Bob will send the updated roadmap to the leadership team, Alice needs "
+            "to revise the hiring plan, and Carol should schedule a security review before the migration starts."
+        ),
+        "question": "When is the mobile release planned?"
+    },
+    {
+        "text": (
+            "This is a quick voice memo after the customer call with the Garcia account. They are happy with "
+            "the reporting feature but support response times have been a problem for them, especially on "
+            "weekends. They asked whether we can offer a dedicated support contact. Their contract renews in "
+            "June and they mentioned a competitor offering a lower price. I think we should propose a premium "
+            "support tier and loop in David Miller from the partnerships team. I need to follow up with a "
+            "written proposal by Friday."
+        ),
+        "question": "Who should be looped in from the partnerships team?"
+    },
+    {
+        "text": (
+            "Retrospective notes for sprint twelve. What went well: the testing pipeline is much faster since "
+            "we parallelized the integration suite, and onboarding for the two new engineers went smoothly. "
+            "What did not go well: we underestimated the search migration and carried three stories over, and "
+            "the staging environment was down for most of Tuesday. Next sprint we will limit work in progress "
+            "to four stories, Erin will own staging reliability, and we are going to add load tests for the "
+            "search endpoints before the next release."
+        ),
+        "question": "Who will own staging reliability?"
+    }
+]
+
+def load_samples(path: str) -> List[Dict[str, str]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def max_rss_mb() -> float:
+    # Peak RSS of this process; ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def tokens(text: str) -> List[str]:
+    return [t.strip(".,!?;:\"'()").lower() for t in text.split() if t.strip(".,!?;:\"'()")]
+
+def f1(prediction: List[str], reference: List[str]) -> float:
+    common = sum((Counter(prediction) & Counter(reference)).values())
+    if not common:
+        return 0.0
+    precision, recall = common / len(prediction), common / len(reference)
+    return 2 * precision * recall / (precision + recall)
+
+def rouge_l(prediction: List[str], reference: List[str]) -> float:
+    """ROUGE-L F1 from the longest common subsequence"""
+    if not prediction or not reference:
+        return 0.0
+    previous = [0] * (len(reference) + 1)
+    for p in prediction:
+        current = [0]
+        for j, r in enumerate(reference):
+            current.append(previous[j] + 1 if p == r else max(previous[j + 1], current[j]))
+        previous = current
+    lcs = previous[-1]
+    if not lcs:
+        return 0.0
+    precision, recall = lcs / len(prediction), lcs / len(reference)
+    return 2 * precision * recall / (precision + recall)
+
+def load_backend(backend: str):
+    if backend == "huggingface":
+        from transformers import pipeline
+        return pipeline("summarization", model=SUMMARIZATION_MODEL), pipeline("question-answering", model=QA_MODEL)
+    return load_cpu_pipelines(backend)
+
+def run_backend(backend: str, samples: List[Dict[str, str]], repeats: int) -> Dict[str, Any]:
+    rss_before = max_rss_mb()
+    start = time.perf_counter()
+    summarizer, qa_pipeline = load_backend(backend)
+    load_seconds = time.perf_counter() - start
+
+    # Warm up once so lazy initialization is not timed
+    summarizer(samples[0]["text"], max_length=60, min_length=15, do_sample=False, truncation=True)
+    qa_pipeline(question=samples[0]["question"], context=samples[0]["text"])
+
+    summaries, answers, summary_ms, qa_ms = [], [], [], []
+    for sample in samples:
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            summary = summarizer(sample["text"], max_length=60, min_length=15, do_sample=False, truncation=True)
+            summary_ms.append((time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            answer = qa_pipeline(question=sample["question"], context=sample["text"])
+            qa_ms.append((time.perf_counter() - t0) * 1000)
+        summaries.append(summary[0]["summary_text"])
+        answers.append(answer["answer"])
+
+    return {
+        "backend": backend,
+        "load_seconds": load_seconds,
+        "peak_rss_mb": max_rss_mb(),
+        "rss_growth_mb": max_rss_mb() - rss_before,
+        "summarization_ms": {"mean": statistics.fmean(summary_ms), "p50": statistics.median(summary_ms)},
+        "qa_ms": {"mean": statistics.fmean(qa_ms), "p50": statistics.median(qa_ms)},
+        "summaries": summaries,
+        "answers": answers
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CPU inference backends against the default pipelines")
+    parser.add_argument("--backends", nargs="+", default=["huggingface"] + list(CPU_BACKENDS))
+    parser.add_argument("--texts", help="JSON lines file of {\"text\", \"question\"} samples")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    samples = load_samples(args.texts) if args.texts else SAMPLES
+    # A fresh process per backend: peak RSS never goes down, so backends sharing a
+    # process would be measured against the previous backend's peak
+    context = multiprocessing.get_context("spawn")
+    runs = []
+    for backend in args.backends:
+        print(f"Running {backend}...", file=sys.stderr)
+        with context.Pool(1) as pool:
+            runs.append(pool.apply(run_backend, (backend, samples, args.repeats)))
+
+    # Agreement is measured against the first backend, the unoptimized pipelines by default
+    reference = runs[0]
+    for run in runs:
+        run["agreement_with"] = reference["backend"]
+        run["rouge1_f1"] = statistics.fmean(
+            f1(tokens(s), tokens(r)) for s, r in zip(run["summaries"], reference["summaries"])
+        )
+        run["rougeL_f1"] = statistics.fmean(
+            rouge_l(tokens(s), tokens(r)) for s, r in zip(run["summaries"], reference["summaries"])
+        )
+        run["qa_exact_match"] = statistics.fmean(
+            float(tokens(a) == tokens(r)) for a, r in zip(run["answers"], reference["answers"])
+        )
+        run["qa_f1"] = statistics.fmean(f1(tokens(a), tokens(r)) for a, r in zip(run["answers"], reference["answers"]))
+        run["speedup_summarization"] = reference["summarization_ms"]["mean"] / run["summarization_ms"]["mean"]
+        run["speedup_qa"] = reference["qa_ms"]["mean"] / run["qa_ms"]["mean"]
+
+    output = json.dumps({
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "samples": len(samples),
+            "repeats": args.repeats
+        },
+        "runs": runs
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Synthetic AudioFile/Transcription corpus generator for benchmarks
+
+Usage:
+    python benchmarks/corpus.py --rows 100000 --db /tmp/voice-ai-bench.db
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services")
+if SERVICES_DIR not in sys.path:
+    sys.path.insert(0, SERVICES_DIR)
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, AudioFile, Transcription
+from query_cache import invalidate_tables
+
+# Filler vocabulary; topic words and the extraction patterns below give searches,
+# trends and extractors realistic amounts of work
+COMMON_WORDS = (
+    "the we and to of a in that is for it on with as was at be this have from or by "
+    "so about what then just like think know really right going there okay yeah well"
+).split()
+TOPIC_WORDS = (
+    "budget meeting project deadline roadmap customer release feature design review "
+    "hiring marketing revenue forecast launch testing migration security onboarding "
+    "retrospective planning metrics quality support contract partner research"
+).split()
+SENTIMENT_WORDS = "good great excellent success achieved problem issue difficult failed terrible".split()
+FIRST_NAMES = "Alice Bob Carol David Erin Frank Grace Henry Irene Jack".split()
+LAST_NAMES = "Smith Jones Brown Garcia Miller Davis Wilson Moore Taylor Clark".split()
+ACTION_PHRASES = ("need to follow", "should review", "must finish", "will send", "going to schedule")
+LANGUAGES = ("en", "en", "en", "es", "fr", "de")
+MODELS = ("whisper-base", "whisper-small", "whisper-medium")
+FORMATS = ("wav", "mp3", "m4a")
+
+def generate_text(rng: random.Random, min_words: int, max_words: int) -> str:
+    """Generate one transcription with a realistic mix of filler, topics, names, dates and actions"""
+    words = []
+    for _ in range(rng.randint(min_words, max_words)):
+        roll = rng.random()
+        if roll < 0.10:
+            words.append(rng.choice(TOPIC_WORDS))
+        elif roll < 0.12:
+            words.append(rng.choice(SENTIMENT_WORDS))
+        elif roll < 0.13:
+            words.append(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}")
+        elif roll < 0.135:
+            words.append(f"{rng.randint(2020, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        elif roll < 0.145:
+            words.append(rng.choice(ACTION_PHRASES))
+        else:
+            words.append(rng.choice(COMMON_WORDS))
+    return " ".join(words)
+
+def generate_corpus(db_url: str, rows: int, min_words: int = 50, max_words: int = 400, days: int = 365,
+                    seed: int = 42, batch_size: int = 5000) -> Dict[str, Any]:
+    """
+    Create the schema and insert `rows` audio files, each with one transcription
+
+    Rows are spread uniformly over the last `days` days so time-range scenarios
+    select a predictable fraction. Inserts use Core executemany batches.
+
+    Args:
+        db_url: SQLAlchemy database URL
+        rows: Number of AudioFile/Transcription pairs
+        min_words, max_words: Transcription length range in words
+        days: Span of created_at values ending now
+        seed: Random seed; the same seed produces the same corpus
+        batch_size: Rows per INSERT batch
+
+    Returns:
+        Dict describing the generated corpus
+    """
+    rng = random.Random(seed)
+    engine = create_engine(db_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    now = datetime.utcnow()
+    span_seconds = days * 86400
+    start = time.perf_counter()
+
+    with engine.begin() as connection:
+        for batch_start in range(0, rows, batch_size):
+            audio_rows = []
+            transcription_rows = []
+            for row_id in range(batch_start + 1, min(rows, batch_start + batch_size) + 1):
+                created_at = now - timedelta(seconds=rng.randint(0, span_seconds))
+                fmt = rng.choice(FORMATS)
+                audio_rows.append({
+                    "id": row_id,
+                    "filename": f"recording_{row_id:07d}.{fmt}",
+                    "file_path": f"/data/recordings/recording_{row_id:07d}.{fmt}",
+                    "file_size": rng.randint(50_000, 50_000_000),
+                    "duration": round(rng.uniform(5, 3600), 1),
+                    "format": fmt,
+                    "created_at": created_at,
+                    "updated_at": created_at
+                })
+                transcription_rows.append({
+                    "id": row_id,
+                    "audio_file_id": row_id,
+                    "text": generate_text(rng, min_words, max_words),
+                    "confidence_score": round(rng.uniform(0.6, 1.0), 3),
+                    "language": rng.choice(LANGUAGES),
+                    "model_used": rng.choice(MODELS),
+                    "created_at": created_at,
+                    "updated_at": created_at
+                })
+            connection.execute(insert(AudioFile), audio_rows)
+            connection.execute(insert(Transcription), transcription_rows)
+
+    # Core inserts bypass ORM events, so drop any cached results explicitly
+    invalidate_tables(AudioFile.__tablename__, Transcription.__tablename__)
+
+    return {
+        "db_url": db_url,
+        "rows": rows,
+        "min_words": min_words,
+        "max_words": max_words,
+        "days": days,
+        "seed": seed,
+        "generation_seconds": time.perf_counter() - start
+    }
+
+def open_session(db_url: str):
+    """Session bound to an existing benchmark database"""
+    return sessionmaker(bind=create_engine(db_url))()
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic voice-ai corpus in SQLite")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--db", default="/tmp/voice-ai-bench.db", help="SQLite file to (re)create")
+    parser.add_argument("--min-words", type=int, default=50)
+    parser.add_argument("--max-words", type=int, default=400)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    info = generate_corpus(f"sqlite:///{args.db}", args.rows, args.min_words, args.max_words, args.days, args.seed)
+    print(f"Generated {info['rows']} rows in {info['generation_seconds']:.1f}s at {args.db}")
+
+if __name__ == "__main__":
+    main()
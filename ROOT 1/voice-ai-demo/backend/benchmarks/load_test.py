@@ -0,0 +1,254 @@
+"""
+Open-loop HTTP load generator for the Flask API
+
+Sends requests at a fixed target rate regardless of how fast the server answers,
+so queueing shows up as latency instead of being hidden by a slower client
+(latency is measured from each request's scheduled start). Needs only the
+standard library and runs fully offline; pair it with mock_llm_server.py.
+
+Usage:
+    python benchmarks/load_test.py --base-url http://127.0.0.1:5000 --rps 20 --duration 60 \\
+        --mix query=5,search=4,transcribe=1 --output load.json
+"""
+import argparse
+import http.client
+import io
+import json
+import math
+import random
+import sys
+import threading
+import time
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+
+QUERIES = (
+    "What was decided about the budget?",
+    "Summarize the last project meeting",
+    "Who is responsible for the release?",
+    "What are the open action items?",
+    "When is the deadline for the roadmap?"
+)
+SEARCH_TERMS = ("budget", "deadline", "customer", "release", "meeting notes", "roadmap review")
+
+def make_wav(seconds: float = 1.0, sample_rate: int = 16000) -> bytes:
+    """A mono 16-bit sine tone, used as the /api/transcribe upload"""
+    frames = bytearray()
+    for i in range(int(seconds * sample_rate)):
+        sample = int(8000 * math.sin(2 * math.pi * 440 * i / sample_rate))
+        frames += sample.to_bytes(2, "little", signed=True)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(bytes(frames))
+    return buffer.getvalue()
+
+class LoadTest:
+    def __init__(self, base_url: str, mix: Dict[str, float], rps: float, duration: float, concurrency: int = 64,
+                 timeout: float = 30.0, wav_seconds: float = 1.0, seed: int = 42):
+        """
+        Args:
+            base_url: Backend root URL
+            mix: Relative weights for the "query", "search" and "transcribe" scenarios
+            rps: Target request rate
+            duration: Seconds to generate load for
+            concurrency: Maximum in-flight requests; further requests queue client-side
+            timeout: Per-request socket timeout in seconds
+            wav_seconds: Length of the audio uploaded to /api/transcribe
+            seed: Random seed for the request mix
+        """
+        parsed = urlparse(base_url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or (443 if parsed.scheme == "https" else 80)
+        self.https = parsed.scheme == "https"
+        self.prefix = parsed.path.rstrip("/")
+        self.mix = {name: weight for name, weight in mix.items() if weight > 0}
+        unknown = set(self.mix) - {"query", "search", "transcribe"}
+        if unknown:
+            raise ValueError(f"Unknown scenarios in mix: {', '.join(sorted(unknown))}")
+        self.rps = rps
+        self.duration = duration
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.rng = random.Random(seed)
+        self.wav = make_wav(wav_seconds) if "transcribe" in self.mix else b""
+        self.results: List[Tuple[str, float, int, str]] = []
+        self._results_lock = threading.Lock()
+        self._local = threading.local()
+
+    def run(self) -> Dict[str, Any]:
+        names = list(self.mix)
+        weights = [self.mix[name] for name in names]
+        total = int(self.rps * self.duration)
+        interval = 1.0 / self.rps
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for i in range(total):
+                scheduled = start + i * interval
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                # Every random draw happens here, on one thread, so --seed fixes the whole request sequence
+                scenario = self.rng.choices(names, weights)[0]
+                pool.submit(self._execute, scenario, self._pick_text(scenario), scheduled)
+        elapsed = time.perf_counter() - start
+        return self.report(elapsed)
+
+    def _pick_text(self, scenario: str) -> Optional[str]:
+        """Query text or search term for a request; transcribe uploads have none"""
+        if scenario == "query":
+            return self.rng.choice(QUERIES)
+        if scenario == "search":
+            return self.rng.choice(SEARCH_TERMS)
+        return None
+
+    def _execute(self, scenario: str, text: Optional[str], scheduled: float):
+        status, error = 0, ""
+        try:
+            status = self._send(scenario, text)
+            if status >= 400:
+                error = f"HTTP {status}"
+        except Exception as e:
+            error = type(e).__name__
+            self._local.connection = None
+        latency = time.perf_counter() - scheduled
+        with self._results_lock:
+            self.results.append((scenario, latency, status, error))
+
+    def _connection(self) -> http.client.HTTPConnection:
+        # One keep-alive connection per worker thread
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            connection = connection_class(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _send(self, scenario: str, text: Optional[str]) -> int:
+        if scenario == "query":
+            body = json.dumps({"query": text}).encode()
+            method, path, headers = "POST", "/api/query", {"Content-Type": "application/json"}
+        elif scenario == "search":
+            body = None
+            params = urlencode({"query": text, "limit": 20})
+            method, path, headers = "GET", f"/api/search?{params}", {}
+        else:
+            boundary = uuid.uuid4().hex
+            body = (
+                f"--{boundary}\r\n"
+                f'Content-Disposition: form-data; name="file"; filename="load_test.wav"\r\n'
+                f"Content-Type: audio/wav\r\n\r\n"
+            ).encode() + self.wav + f"\r\n--{boundary}--\r\n".encode()
+            method, path = "POST", "/api/transcribe"
+            headers = {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+        connection = self._connection()
+        connection.request(method, self.prefix + path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        if response.getheader("Connection", "").lower() == "close":
+            connection.close()
+            self._local.connection = None
+        return response.status
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        with self._results_lock:
+            results = list(self.results)
+        scenarios = {}
+        for name in sorted({r[0] for r in results}):
+            scenarios[name] = self._summarize([r for r in results if r[0] == name], elapsed)
+        return {
+            "meta": {
+                "timestamp": datetime.now().isoformat(),
+                "target_rps": self.rps,
+                "duration_seconds": self.duration,
+                "elapsed_seconds": elapsed,
+                "concurrency": self.concurrency,
+                "mix": self.mix
+            },
+            "overall": self._summarize(results, elapsed),
+            "scenarios": scenarios
+        }
+
+    def _summarize(self, results: List[Tuple[str, float, int, str]], elapsed: float) -> Dict[str, Any]:
+        latencies = sorted(r[1] * 1000 for r in results)
+        errors = {}
+        for r in results:
+            if r[3]:
+                errors[r[3]] = errors.get(r[3], 0) + 1
+        error_count = sum(errors.values())
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, max(0, math.ceil(p / 100 * len(latencies)) - 1))]
+
+        return {
+            "requests": len(results),
+            "throughput_rps": (len(results) - error_count) / elapsed if elapsed else 0.0,
+            "error_rate": error_count / len(results) if results else 0.0,
+            "errors": errors,
+            "latency_ms": {
+                "p50": percentile(50),
+                "p90": percentile(90),
+                "p95": percentile(95),
+                "p99": percentile(99),
+                "max": latencies[-1] if latencies else None
+            }
+        }
+
+def parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the voice-ai API")
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--rps", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--mix", default="query=5,search=4,transcribe=1",
+                        help="Comma separated scenario=weight pairs")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--wav-seconds", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mock-llm-port", type=int,
+                        help="Also run mock_llm_server on this port for the duration of the test")
+    parser.add_argument("--mock-llm-latency-ms", type=float, default=300.0)
+    parser.add_argument("--output", help="Write JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    mock_server = None
+    if args.mock_llm_port:
+        from mock_llm_server import MockLLMConfig, start_mock_server
+        mock_server = start_mock_server(port=args.mock_llm_port,
+                                        config=MockLLMConfig(latency_ms=args.mock_llm_latency_ms, seed=args.seed))
+        print(f"Mock LLM on http://127.0.0.1:{args.mock_llm_port}/v1", file=sys.stderr)
+
+    try:
+        test = LoadTest(args.base_url, parse_mix(args.mix), args.rps, args.duration, args.concurrency,
+                        args.timeout, args.wav_seconds, args.seed)
+        report = test.run()
+    finally:
+        if mock_server is not None:
+            mock_server.shutdown()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Local mock of the OpenAI chat completions API for offline load tests
+
+Serves POST /v1/chat/completions (regular and "stream": true server-sent events)
+and GET /v1/models with tunable latency, streaming speed and injected errors.
+Point the backend at it before starting it:
+
+    python benchmarks/mock_llm_server.py --port 8001 --latency-ms 400 --jitter-ms 150
+    OPENAI_API_BASE=http://127.0.0.1:8001/v1 OPENAI_API_KEY=mock python app.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class MockLLMConfig:
+    def __init__(self, latency_ms: float = 300.0, jitter_ms: float = 100.0, tokens_per_second: float = 50.0,
+                 response_tokens: int = 60, error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: int = None):
+        """
+        Args:
+            latency_ms: Mean time to first token
+            jitter_ms: Uniform +/- jitter around latency_ms
+            tokens_per_second: Generation speed; also paces streamed chunks
+            response_tokens: Tokens per reply (capped by the request's max_tokens)
+            error_rate: Fraction of requests answered with HTTP 500
+            rate_limit_rate: Fraction of requests answered with HTTP 429
+            seed: Random seed for reproducible latency and error sequences
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+
+    def draw(self):
+        """Pick (first token delay in seconds, injected status code or None) for one request"""
+        with self.lock:
+            self.requests += 1
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return delay, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, 500
+        return delay, None
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = MockLLMConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/") in ("/v1/models", "/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "gpt-3.5-turbo", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body"}})
+            return
+        if self.path.rstrip("/") not in ("/v1/chat/completions", "/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+            return
+
+        delay, status = self.config.draw()
+        time.sleep(delay)
+        if status == 429:
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "requests"}},
+                            {"Retry-After": "1"})
+            return
+        if status == 500:
+            self._send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+
+        tokens = self._reply_tokens(body)
+        if body.get("stream"):
+            self._stream(body, tokens)
+        else:
+            time.sleep(len(tokens) / self.config.tokens_per_second if self.config.tokens_per_second else 0)
+            prompt_tokens = sum(len(m.get("content", "").split()) for m in body.get("messages", []))
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "gpt-3.5-turbo"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(tokens)},
+                    "finish_reason": "stop"
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(tokens),
+                    "total_tokens": prompt_tokens + len(tokens)
+                }
+            })
+
+    def _reply_tokens(self, body):
+        """Reply words drawn from the prompt so answers look loosely related"""
+        prompt_words = " ".join(m.get("content", "") for m in body.get("messages", [])).split() or ["ok"]
+        count = min(self.config.response_tokens, int(body.get("max_tokens") or self.config.response_tokens))
+        return [prompt_words[i % len(prompt_words)] for i in range(max(1, count))]
+
+    def _stream(self, body, tokens):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        interval = 1 / self.config.tokens_per_second if self.config.tokens_per_second else 0
+        for i, token in enumerate(tokens):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "gpt-3.5-turbo"),
+                "choices": [{"index": 0, "delta": {"content": token if i == 0 else " " + token}, "finish_reason": None}]
+            }
+            self._write_chunk(f"data: {json.dumps(chunk)}\n\n")
+            if interval:
+                time.sleep(interval)
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, text: str):
+        data = text.encode()
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _send_json(self, status: int, payload, headers=None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+def start_mock_server(host: str = "127.0.0.1", port: int = 8001, config: MockLLMConfig = None) -> ThreadingHTTPServer:
+    """Start the mock server on a daemon thread; call .shutdown() to stop it"""
+    handler = type("ConfiguredMockLLMHandler", (MockLLMHandler,), {"config": config or MockLLMConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-llm-server", daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = MockLLMConfig(args.latency_ms, args.jitter_ms, args.tokens_per_second, args.response_tokens,
+                           args.error_rate, args.rate_limit_rate, args.seed)
+    handler = type("ConfiguredMockLLMHandler", (MockLLMHandler,), {"config": config})
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    server.daemon_threads = True
+    print(f"Mock LLM listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Reproducible benchmark suite for SearchService and AIService
+
+Generates a synthetic corpus per size in local SQLite, runs timed scenarios
+against it with a stubbed LLM and writes machine-readable JSON.
+
+Usage:
+    python benchmarks/run_benchmarks.py --sizes 1000 10000 100000 --output bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from corpus import generate_corpus, open_session, TOPIC_WORDS
+
+import sqlalchemy
+
+from ai_service import AIService
+from stub_llm import StubLLMClient
+
+SEARCH_QUERIES = ("budget", "deadline review", "customer", "launch plan", "nonexistent phrase")
+TREND_TYPES = ("topics", "frequency", "sentiment", "keywords", "general")
+EXTRACTION_TYPES = ("general", "names", "dates", "actions", "topics")
+
+def time_scenario(name: str, func: Callable[[int], Any], iterations: int, warmup: int,
+                  params: Dict[str, Any]) -> Dict[str, Any]:
+    """Run func(i) warmup + iterations times and summarize the timed runs in milliseconds"""
+    for i in range(warmup):
+        func(i)
+
+    durations = []
+    failures = 0
+    for i in range(iterations):
+        start = time.perf_counter()
+        result = func(i)
+        durations.append((time.perf_counter() - start) * 1000)
+        if isinstance(result, dict) and result.get("success") is False:
+            failures += 1
+
+    ordered = sorted(durations)
+    return {
+        "name": name,
+        "params": params,
+        "iterations": iterations,
+        "failures": failures,
+        "ms": {
+            "min": ordered[0],
+            "mean": statistics.fmean(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max": ordered[-1]
+        }
+    }
+
+def run_size(rows: int, args) -> Dict[str, Any]:
+    """Generate a corpus of `rows` rows and run every scenario against it"""
+    db_path = os.path.join(args.workdir, f"bench_{rows}.db")
+    corpus = generate_corpus(f"sqlite:///{db_path}", rows, args.min_words, args.max_words, args.days, args.seed)
+    session = open_session(f"sqlite:///{db_path}")
+
+    stub = StubLLMClient(latency=args.llm_latency)
+    ai = AIService(session, model_type="openai", api_key="benchmark-stub")
+    ai.llm_client = stub
+    if not args.with_cache:
+        ai.search_service.cache = None
+
+    rng = random.Random(args.seed)
+    recording_ids = [str(rng.randint(1, rows)) for _ in range(args.iterations + args.warmup)]
+    iterations, warmup = args.iterations, args.warmup
+    scenarios = []
+
+    for query in SEARCH_QUERIES:
+        scenarios.append(time_scenario(
+            "search_transcriptions", lambda i, q=query: ai.search_service.search_transcriptions(q),
+            iterations, warmup, {"query": query}
+        ))
+
+    scenarios.append(time_scenario(
+        "summarize_recording", lambda i: ai.summarize_recording(recording_ids[i % len(recording_ids)]),
+        iterations, warmup, {"summary_type": "brief"}
+    ))
+
+    for analysis_type in TREND_TYPES:
+        scenarios.append(time_scenario(
+            "analyze_trends", lambda i, t=analysis_type: ai.analyze_trends("30d", t),
+            iterations, warmup, {"time_range": "30d", "analysis_type": analysis_type}
+        ))
+
+    for extraction_type in EXTRACTION_TYPES:
+        scenarios.append(time_scenario(
+            "extract_information", lambda i, t=extraction_type: ai.extract_information("budget", t),
+            iterations, warmup, {"query": "budget", "extraction_type": extraction_type}
+        ))
+
+    topic = TOPIC_WORDS[0]
+    scenarios.append(time_scenario(
+        "smart_search_with_context", lambda i: ai.smart_search_with_context(topic, include_audio_context=True),
+        iterations, warmup, {"query": topic, "include_audio_context": True}
+    ))
+
+    session.close()
+    if not args.keep_db:
+        os.remove(db_path)
+
+    return {"corpus": corpus, "llm": stub.stats(), "scenarios": scenarios}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search and AI scenarios on synthetic corpora")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                        help="Corpus sizes in rows (1k to 1M)")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--min-words", type=int, default=50)
+    parser.add_argument("--max-words", type=int, default=400)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Stub LLM latency in seconds")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the SearchService result cache enabled")
+    parser.add_argument("--workdir", default=tempfile.gettempdir())
+    parser.add_argument("--keep-db", action="store_true")
+    parser.add_argument("--output", help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "sqlalchemy": sqlalchemy.__version__,
+            "platform": platform.platform(),
+            "args": vars(args)
+        },
+        "runs": []
+    }
+    for rows in args.sizes:
+        print(f"Benchmarking {rows} rows...", file=sys.stderr)
+        results["runs"].append(run_size(rows, args))
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+In-process stand-in for the LLMClient used by AIService
+
+Replies after a fixed, configurable latency so benchmarks measure our own code
+rather than a provider.
+"""
+import threading
+import time
+
+class StubLLMClient:
+    def __init__(self, latency: float = 0.0):
+        """
+        Args:
+            latency: Seconds to sleep per completion
+        """
+        self.latency = latency
+        self.calls = 0
+        self.prompt_chars = 0
+        self._lock = threading.Lock()
+
+    def chat(self, messages, model=None, max_tokens: int = 256, temperature: float = 0.7, **kwargs) -> str:
+        prompt = " ".join(message.get("content", "") for message in messages)
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+        if self.latency:
+            time.sleep(self.latency)
+        # Echo the head of the prompt so output size tracks max_tokens
+        words = prompt.split()[:max(1, min(max_tokens, 60))]
+        return "Stub response: " + " ".join(words)
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "prompt_chars": self.prompt_chars}
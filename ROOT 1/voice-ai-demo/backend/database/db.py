@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -20,6 +20,11 @@ class AudioFile(Base):
     # Relationship to transcriptions
     transcriptions = relationship("Transcription", back_populates="audio_file")
     
+    # Composite index backing the format/duration filters of advanced search
+    __table_args__ = (
+        Index('ix_audio_files_format_duration', 'format', 'duration'),
+    )
+    
     def __repr__(self):
         return f"<AudioFile(id={self.id}, filename='{self.filename}')>"
 
@@ -38,6 +43,15 @@ class Transcription(Base):
     # Relationship to audio file
     audio_file = relationship("AudioFile", back_populates="transcriptions")
     
+    # Indexes backing advanced search filters and (created_at, id) keyset pagination
+    __table_args__ = (
+        Index('ix_transcriptions_created_at_id', 'created_at', 'id'),
+        Index('ix_transcriptions_language_created_at', 'language', 'created_at'),
+        Index('ix_transcriptions_model_used_created_at', 'model_used', 'created_at'),
+        Index('ix_transcriptions_confidence_score', 'confidence_score'),
+        Index('ix_transcriptions_audio_file_id', 'audio_file_id'),
+    )
+    
     def __repr__(self):
         return f"<Transcription(id={self.id}, audio_file_id={self.audio_file_id})>"
 
@@ -54,6 +68,10 @@ class AIAnalysis(Base):
     # Relationship to transcription
     transcription = relationship("Transcription")
     
+    __table_args__ = (
+        Index('ix_ai_analyses_transcription_type', 'transcription_id', 'analysis_type'),
+    )
+    
     def __repr__(self):
         return f"<AIAnalysis(id={self.id}, type='{self.analysis_type}')>"
 
@@ -62,9 +80,20 @@ class SearchQuery(Base):
     
     id = Column(Integer, primary_key=True)
     query_text = Column(String(500), nullable=False)
+    source = Column(String(50))  # Instrumented entry point, e.g. search.advanced_search
     results_count = Column(Integer, default=0)
     execution_time = Column(Float)  # Query execution time in seconds
+    db_time = Column(Float)  # Per-stage breakdown of execution_time, in seconds
+    ranking_time = Column(Float)
+    llm_time = Column(Float)
+    serialization_time = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Indexes backing latency reports over recent and slowest queries
+    __table_args__ = (
+        Index('ix_search_queries_created_at', 'created_at'),
+        Index('ix_search_queries_execution_time', 'execution_time'),
+    )
+    
     def __repr__(self):
         return f"<SearchQuery(id={self.id}, query='{self.query_text[:50]}...')>"
\ No newline at end of file
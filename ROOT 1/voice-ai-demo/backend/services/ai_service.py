@@ -1,24 +1,32 @@
+import hashlib
+import json
 import logging
-from typing import Dict, Any, Optional, List
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime, timedelta
 import re
 
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
 # Import other services from the same project
 from search_service import SearchService
 from transcription_service import TranscriptionService
 from audio_service import AudioService
+from query_log import profile_query
+from tracing import traced
+from context_packer import ContextPacker, context_budget
+from summarization import ChunkSummaryCache, MapReduceSummarizer
+from batching import MicroBatcher
+from cpu_inference import CPU_BACKENDS, SUMMARIZATION_MODEL, load_cpu_pipelines
+from llm_client import LLMClient
+from single_flight import SingleFlight
 
 # Import database models
 from models import Transcription, AudioFile, AIAnalysis
 
 # Import AI libraries with error handling
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    print("Warning: OpenAI not installed. Install with: pip install openai")
-
 try:
     from transformers import pipeline
     TRANSFORMERS_AVAILABLE = True
@@ -26,15 +34,74 @@ except ImportError:
     TRANSFORMERS_AVAILABLE = False
     print("Warning: Transformers not installed. Install with: pip install transformers torch")
 
+CHAT_MODEL = "gpt-3.5-turbo"
+
+# LLMClient settings, overridable per AIService through llm_options:
+# chat completions in flight at once (across request threads and map-phase workers),
+# deadline per call in seconds including retries, and request rate (0 for no limit) and burst
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "8"))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "30"))
+LLM_RATE_PER_SECOND = float(os.environ.get("LLM_RATE_PER_SECOND", "0"))
+LLM_BURST = int(os.environ.get("LLM_BURST", "10"))
+
+# Model types served by local transformers pipelines through the _*_with_huggingface methods
+LOCAL_PIPELINE_MODEL_TYPES = ("huggingface",) + CPU_BACKENDS
+
+# Completion token limits per call site
+QUERY_MAX_TOKENS = 500
+SEARCH_SUMMARY_MAX_TOKENS = 150
+SUMMARY_MAX_TOKENS = 300
+
+# Retrieved transcriptions considered when packing prompt context
+MAX_CONTEXT_CANDIDATES = 20
+
+# Context budget for search summaries, which only need a short overview
+SEARCH_SUMMARY_CONTEXT_TOKENS = 400
+
+# Map-reduce summarization: chunk sizes per backend input limit, partial summary
+# length, concurrent API calls and pipeline batch size in the map phase
+OPENAI_SUMMARY_CHUNK_WORDS = 1500
+HUGGINGFACE_SUMMARY_CHUNK_WORDS = 600  # bart-large-cnn reads at most 1024 tokens
+HUGGINGFACE_SUMMARY_INPUT_TOKENS = 900  # reduce input budget, with margin for tokenizer differences
+CHUNK_SUMMARY_MAX_TOKENS = 200
+SUMMARY_MAP_WORKERS = 4
+
+# Micro-batching of local pipeline calls: largest batch and how long a request
+# waits for others to join it
+PIPELINE_MAX_BATCH_SIZE = 16
+PIPELINE_MAX_BATCH_WAIT_MS = 5.0
+
+# Sliding window over QA contexts longer than the model input, in tokens
+QA_MAX_SEQ_LEN = 384
+QA_DOC_STRIDE = 128
+
+# Passages packed for local extractive QA: about 15 passages of ~160 tokens, so one
+# query fits in a single micro-batch of PIPELINE_MAX_BATCH_SIZE
+QA_CONTEXT_TOKENS = 2400
+
+NO_CONTEXT_ANSWER = "No relevant recordings found to answer your question. Try recording some content about this topic first."
+
+# AIAnalysis.analysis_type of the rolling summary state kept per transcription
+ROLLING_SUMMARY_ANALYSIS = "rolling_summary"
+
+# Output length (max_length, min_length) of the Hugging Face summarizer per summary_type
+HUGGINGFACE_SUMMARY_LENGTHS = {
+    "brief": (60, 15),
+    "detailed": (250, 80),
+    "bullet_points": (150, 30)
+}
+
 class AIService:
-    def __init__(self, db_session, model_type="openai", api_key=None):
+    def __init__(self, db_session, model_type="openai", api_key=None, llm_options: Optional[Dict[str, Any]] = None):
         """
         Initialize AI Service with integration to other project services
         
         Args:
             db_session: Database session for accessing transcriptions
-            model_type: "openai", "huggingface", or "local"
+            model_type: "openai", "huggingface", "quantized" (int8 CPU), "onnx" (ONNX Runtime CPU) or "local"
             api_key: API key for external services
+            llm_options: LLMClient keyword arguments overriding the LLM_* defaults,
+                e.g. {"timeout": 10, "rate_per_second": 5}
         """
         self.db_session = db_session
         self.model_type = model_type
@@ -45,25 +112,54 @@ class AIService:
         self.transcription_service = None  # Will be set when needed
         self.audio_service = AudioService()
         
+        # Retrieved transcriptions are packed into token-budgeted prompt context
+        self.chat_model = CHAT_MODEL
+        self.context_packer = ContextPacker()
+        
         # Initialize the appropriate AI model
         if model_type == "openai":
             if not api_key:
                 raise ValueError("OpenAI API key required for OpenAI model")
-            openai.api_key = api_key
-            self.model = None  # We'll use openai directly
-        elif model_type == "huggingface":
-            # Initialize Hugging Face transformers
-            self.summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-            self.qa_pipeline = pipeline("question-answering")
+            # Pooled connections, deadlines, retries and rate limiting for every OpenAI call
+            self.llm_client = LLMClient(api_key, **dict({
+                "timeout": LLM_TIMEOUT,
+                "max_concurrency": LLM_MAX_CONCURRENCY,
+                "rate_per_second": LLM_RATE_PER_SECOND,
+                "burst": LLM_BURST
+            }, **(llm_options or {})))
+            self.model = None
+        elif model_type in LOCAL_PIPELINE_MODEL_TYPES:
+            if model_type == "huggingface":
+                # Initialize Hugging Face transformers
+                self.summarizer = pipeline("summarization", model=SUMMARIZATION_MODEL)
+                self.qa_pipeline = pipeline("question-answering")
+            else:
+                # Same models, quantized to int8 or run by ONNX Runtime for CPU-only servers
+                self.summarizer, self.qa_pipeline = load_cpu_pipelines(model_type)
             self.model = None
+            # Concurrent requests share batched forward passes instead of running at batch size 1
+            self.summarize_batcher = MicroBatcher(
+                self._run_summarizer_batch, PIPELINE_MAX_BATCH_SIZE, PIPELINE_MAX_BATCH_WAIT_MS, "summarizer"
+            )
+            self.qa_batcher = MicroBatcher(
+                self._run_qa_batch, PIPELINE_MAX_BATCH_SIZE, PIPELINE_MAX_BATCH_WAIT_MS, "qa"
+            )
         else:
             # For local/custom models
             self.model = None
+        
+        # Long transcriptions are summarized chunk by chunk; chunk summaries are cached
+        self.chunk_summary_cache = ChunkSummaryCache()
+        self.map_reduce_summarizer = self._build_map_reduce_summarizer()
+        
+        # Identical concurrent queries and summaries share one computation
+        self.single_flight = SingleFlight("ai")
 
     def set_transcription_service(self, transcription_service: TranscriptionService):
         """Set the transcription service for this AI service"""
         self.transcription_service = transcription_service
             
+    @traced()
     def process_query(self, query: str, context_recordings: List[str] = None) -> Dict[str, Any]:
         """
         Process a user query against transcribed recordings using SearchService
@@ -75,28 +171,56 @@ class AIService:
         Returns:
             Dict containing response and metadata
         """
+        # Retrieval matches case-insensitively but spacing changes which rows match,
+        # so case is the only normalization that cannot change the answer
+        key = ("process_query", (query or "").lower(), tuple(context_recordings or ()), self.model_type)
+        result = self.single_flight.do(key, lambda: self._process_query(query, context_recordings))
+        # A coalesced caller may have asked with different casing
+        result["query"] = query
+        return result
+
+    def _process_query(self, query: str, context_recordings: Optional[List[str]]) -> Dict[str, Any]:
         try:
-            # Use SearchService to get relevant transcriptions
-            if context_recordings:
-                # Get specific recordings by ID (assuming SearchService has this method)
-                context_transcriptions = []
-                for rec_id in context_recordings:
-                    # This would need to be implemented in SearchService
-                    pass
-            else:
-                # Use SearchService to find relevant transcriptions
-                context_transcriptions = self.search_service.search_transcriptions(query)
-            
-            context_texts = [trans.text for trans in context_transcriptions[:5]]  # Limit to top 5
-            
-            if self.model_type == "openai":
-                response = self._process_with_openai(query, context_texts)
-            elif self.model_type == "huggingface":
-                response = self._process_with_huggingface(query, context_texts)
-            else:
-                response = self._process_with_local_model(query, context_texts)
+            with profile_query(query, "ai.process_query") as profile:
+                with profile.stage("db"):
+                    # Use SearchService to get relevant transcriptions
+                    if context_recordings:
+                        # Get specific recordings by ID (assuming SearchService has this method)
+                        context_transcriptions = []
+                        for rec_id in context_recordings:
+                            # This would need to be implemented in SearchService
+                            pass
+                    else:
+                        # Use SearchService to find relevant transcriptions
+                        context_transcriptions = self.search_service.search_transcriptions(query)
+                profile.results_count = len(context_transcriptions)
                 
-            return {
+                # Keep the most relevant passages of the top candidates within the model's context budget
+                with profile.stage("ranking"):
+                    context_passages = self.context_packer.pack_sources(
+                        query,
+                        [(trans.id, trans.text) for trans in context_transcriptions[:MAX_CONTEXT_CANDIDATES]],
+                        self._query_context_budget()
+                    )
+                    context_texts = [passage["text"] for passage in context_passages]
+                
+                answer_source = None
+                with profile.stage("llm"):
+                    if self.model_type == "openai":
+                        response = self._process_with_openai(query, context_texts)
+                    elif self.model_type in LOCAL_PIPELINE_MODEL_TYPES:
+                        answer = self._answer_from_passages(query, context_passages)
+                        if answer:
+                            response = answer["answer"]
+                            answer_source = {
+                                key: answer[key] for key in ("transcription_id", "offset", "score", "supporting_passages")
+                            }
+                        else:
+                            response = NO_CONTEXT_ANSWER
+                    else:
+                        response = self._process_with_local_model(query, context_texts)
+                
+            result = {
                 "success": True,
                 "response": response,
                 "query": query,
@@ -104,6 +228,9 @@ class AIService:
                 "context_used": len(context_texts) > 0,
                 "sources_found": len(context_transcriptions)
             }
+            if answer_source:
+                result["answer_source"] = answer_source
+            return result
             
         except Exception as e:
             self.logger.error(f"Error processing query: {str(e)}")
@@ -114,57 +241,88 @@ class AIService:
                 "timestamp": datetime.now().isoformat()
             }
 
-    def summarize_recording(self, recording_id: str, summary_type: str = "brief") -> Dict[str, Any]:
+    @traced()
+    def summarize_recording(self, recording_id: str, summary_type: str = "brief",
+                            incremental: bool = False) -> Dict[str, Any]:
         """
         Generate a summary of a specific recording using SearchService to find it
         
         Args:
             recording_id: ID of the recording to summarize
             summary_type: "brief", "detailed", or "bullet_points"
+            incremental: For recordings that keep growing: only run the map phase over
+                text added since the last incremental summary, reducing over the stored
+                partial summaries of the earlier text
             
         Returns:
             Dict containing summary and metadata
         """
+        key = ("summarize_recording", str(recording_id), summary_type, incremental, self.model_type)
+        return self.single_flight.do(
+            key, lambda: self._summarize_recording(recording_id, summary_type, incremental)
+        )
+
+    def _find_audio_file(self, recording_id: str) -> Optional[AudioFile]:
+        """
+        Look a recording up by primary key, falling back to its exact filename or
+        filename without extension
+        """
+        recording_id = str(recording_id).strip()
+        if recording_id.isdigit():
+            audio_file = self.db_session.get(AudioFile, int(recording_id))
+            if audio_file is not None:
+                return audio_file
+
+        escaped = recording_id.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        candidates = self.db_session.query(AudioFile).filter(or_(
+            AudioFile.filename == recording_id,
+            AudioFile.filename.like(f"{escaped}.%", escape="\\")
+        )).order_by(AudioFile.id).all()
+        for audio_file in candidates:
+            if recording_id in (audio_file.filename, os.path.splitext(audio_file.filename)[0]):
+                return audio_file
+        return None
+
+    def _summarize_recording(self, recording_id: str, summary_type: str, incremental: bool) -> Dict[str, Any]:
         try:
-            # Use SearchService to get the transcription
-            # First get all audio files and find the one we want
-            audio_files = self.search_service.get_audio_files()
-            target_audio_file = None
-            
-            for audio_file in audio_files:
-                if str(audio_file.id) == recording_id or audio_file.filename.contains(recording_id):
-                    target_audio_file = audio_file
-                    break
-            
-            if not target_audio_file:
-                return {
-                    "success": False,
-                    "error": f"Recording {recording_id} not found",
-                    "recording_id": recording_id
-                }
-            
-            # Get associated transcription
-            # This assumes there's a relationship between AudioFile and Transcription
-            transcription = self.db_session.query(Transcription).filter(
-                Transcription.audio_file_id == target_audio_file.id
-            ).first()
-            
-            if not transcription:
-                return {
-                    "success": False,
-                    "error": f"No transcription found for recording {recording_id}",
-                    "recording_id": recording_id
-                }
-            
-            # Generate summary based on model type
-            if self.model_type == "openai":
-                summary = self._summarize_with_openai(transcription.text, summary_type)
-            elif self.model_type == "huggingface":
-                summary = self._summarize_with_huggingface(transcription.text, summary_type)
-            else:
-                summary = self._summarize_with_local_model(transcription.text, summary_type)
+            with profile_query(f"summarize:{recording_id}", "ai.summarize_recording") as profile:
+                with profile.stage("db"):
+                    target_audio_file = self._find_audio_file(recording_id)
+                    
+                    if not target_audio_file:
+                        return {
+                            "success": False,
+                            "error": f"Recording {recording_id} not found",
+                            "recording_id": recording_id
+                        }
+                    
+                    # Get associated transcription
+                    # This assumes there's a relationship between AudioFile and Transcription
+                    transcription = self.db_session.query(Transcription).filter(
+                        Transcription.audio_file_id == target_audio_file.id
+                    ).first()
                 
-            return {
+                if not transcription:
+                    return {
+                        "success": False,
+                        "error": f"No transcription found for recording {recording_id}",
+                        "recording_id": recording_id
+                    }
+                profile.results_count = 1
+                
+                if incremental:
+                    with profile.stage("db"):
+                        state = self._load_rolling_summary(transcription.id)
+                    with profile.stage("llm"):
+                        summary, rolling = self._summarize_incrementally(transcription.text, summary_type, state)
+                    with profile.stage("db"):
+                        self._save_rolling_summary(transcription.id, state, rolling)
+                else:
+                    # Generate summary based on model type
+                    with profile.stage("llm"):
+                        summary = self._summarize_text(transcription.text, summary_type)
+                
+            result = {
                 "success": True,
                 "summary": summary,
                 "recording_id": recording_id,
@@ -174,6 +332,9 @@ class AIService:
                 "summary_length": len(summary.split()),
                 "timestamp": datetime.now().isoformat()
             }
+            if incremental:
+                result["incremental"] = {"mode": rolling["mode"], "new_chars": rolling["new_chars"]}
+            return result
             
         except Exception as e:
             self.logger.error(f"Error summarizing recording {recording_id}: {str(e)}")
@@ -183,6 +344,7 @@ class AIService:
                 "recording_id": recording_id
             }
 
+    @traced()
     def extract_information(self, query: str, extraction_type: str = "general") -> Dict[str, Any]:
         """
         Extract specific information from transcriptions using SearchService
@@ -195,19 +357,23 @@ class AIService:
             Dict containing extracted information
         """
         try:
-            # Use SearchService to get relevant transcriptions
-            relevant_transcriptions = self.search_service.search_transcriptions(query)
-            
-            if extraction_type == "names":
-                extracted_info = self._extract_names(relevant_transcriptions)
-            elif extraction_type == "dates":
-                extracted_info = self._extract_dates(relevant_transcriptions)
-            elif extraction_type == "actions":
-                extracted_info = self._extract_actions(relevant_transcriptions, query)
-            elif extraction_type == "topics":
-                extracted_info = self._extract_topics(relevant_transcriptions)
-            else:
-                extracted_info = self._extract_general_info(relevant_transcriptions, query)
+            with profile_query(query, "ai.extract_information") as profile:
+                with profile.stage("db"):
+                    # Use SearchService to get relevant transcriptions
+                    relevant_transcriptions = self.search_service.search_transcriptions(query)
+                profile.results_count = len(relevant_transcriptions)
+                
+                with profile.stage("ranking"):
+                    if extraction_type == "names":
+                        extracted_info = self._extract_names(relevant_transcriptions)
+                    elif extraction_type == "dates":
+                        extracted_info = self._extract_dates(relevant_transcriptions)
+                    elif extraction_type == "actions":
+                        extracted_info = self._extract_actions(relevant_transcriptions, query)
+                    elif extraction_type == "topics":
+                        extracted_info = self._extract_topics(relevant_transcriptions)
+                    else:
+                        extracted_info = self._extract_general_info(relevant_transcriptions, query)
                 
             return {
                 "success": True,
@@ -226,6 +392,7 @@ class AIService:
                 "query": query
             }
 
+    @traced()
     def analyze_trends(self, time_range: str = "30d", analysis_type: str = "topics") -> Dict[str, Any]:
         """
         Analyze trends in recordings over time using SearchService
@@ -286,6 +453,7 @@ class AIService:
                 "time_range": time_range
             }
 
+    @traced()
     def transcribe_and_analyze_current_recording(self, transcription_model) -> Dict[str, Any]:
         """
         Integrate with AudioService to transcribe current recording and provide AI analysis
@@ -342,6 +510,7 @@ class AIService:
                 "error": str(e)
             }
 
+    @traced()
     def smart_search_with_context(self, query: str, include_audio_context: bool = False) -> Dict[str, Any]:
         """
         Enhanced search that combines SearchService results with AI interpretation
@@ -354,21 +523,28 @@ class AIService:
             Enhanced search results with AI insights
         """
         try:
-            # Use SearchService for basic search
-            transcription_results = self.search_service.search_transcriptions(query)
-            
-            if include_audio_context:
-                audio_results = self.search_service.search_audio_files(query)
-            else:
-                audio_results = []
-            
-            # AI-enhanced interpretation of results
-            if transcription_results:
-                ai_summary = self._generate_search_summary(query, transcription_results)
-                suggested_follow_ups = self._generate_follow_up_questions(query, transcription_results)
-            else:
-                ai_summary = f"No direct matches found for '{query}'. Consider trying related terms."
-                suggested_follow_ups = []
+            with profile_query(query, "ai.smart_search_with_context") as profile:
+                with profile.stage("db"):
+                    # Use SearchService for basic search
+                    transcription_results = self.search_service.search_transcriptions(query)
+                    
+                    if include_audio_context:
+                        audio_results = self.search_service.search_audio_files(query)
+                    else:
+                        audio_results = []
+                profile.results_count = len(transcription_results)
+                
+                with profile.stage("ranking"):
+                    relevance_scores = [self._calculate_relevance(query, trans.text) for trans in transcription_results]
+                
+                # AI-enhanced interpretation of results
+                with profile.stage("llm"):
+                    if transcription_results:
+                        ai_summary = self._generate_search_summary(query, transcription_results)
+                        suggested_follow_ups = self._generate_follow_up_questions(query, transcription_results)
+                    else:
+                        ai_summary = f"No direct matches found for '{query}'. Consider trying related terms."
+                        suggested_follow_ups = []
             
             return {
                 "success": True,
@@ -378,9 +554,9 @@ class AIService:
                         "id": trans.id,
                         "text_snippet": trans.text[:200] + "..." if len(trans.text) > 200 else trans.text,
                         "created_at": trans.created_at.isoformat(),
-                        "relevance_score": self._calculate_relevance(query, trans.text)
+                        "relevance_score": score
                     }
-                    for trans in transcription_results
+                    for trans, score in zip(transcription_results, relevance_scores)
                 ],
                 "audio_results": [
                     {
@@ -405,6 +581,7 @@ class AIService:
             }
 
     # Private helper methods remain largely the same but now use project services
+    @traced()
     def _process_with_openai(self, query: str, context: List[str]) -> str:
         """Process query using OpenAI API"""
         context_text = "\n\n".join(context) if context else "No previous recordings found."
@@ -421,43 +598,109 @@ class AIService:
         If the transcriptions don't contain relevant information, let them know and suggest they might want to record more content on this topic.
         """
         
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
+        return self.llm_client.chat(
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=500,
+            model=self.chat_model,
+            max_tokens=QUERY_MAX_TOKENS,
             temperature=0.7
         )
-        
-        return response.choices[0].message.content.strip()
 
+    @traced()
     def _process_with_huggingface(self, query: str, context: List[str]) -> str:
         """Process query using Hugging Face models"""
-        if not context:
-            return "No relevant recordings found to answer your question. Try recording some content about this topic first."
-            
-        # Use the QA pipeline with the most relevant context
-        context_text = context[0]  # Use first context for simplicity
-        
-        result = self.qa_pipeline(question=query, context=context_text)
-        return result['answer']
+        answer = self._answer_from_passages(
+            query, [{"source_id": None, "offset": 0, "text": text} for text in context]
+        )
+        return answer["answer"] if answer else NO_CONTEXT_ANSWER
+
+    def _query_context_budget(self) -> int:
+        """Tokens of retrieved passages packed for process_query on the active backend"""
+        if self.model_type in LOCAL_PIPELINE_MODEL_TYPES:
+            return QA_CONTEXT_TOKENS
+        return context_budget(self.chat_model, QUERY_MAX_TOKENS)
+
+    @traced()
+    def _answer_from_passages(self, query: str, passages: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """
+        Extractive QA over every packed passage, aggregating answers by score
+
+        All passages go through the QA pipeline in one batch; passages longer than the
+        model input are read in overlapping windows of QA_MAX_SEQ_LEN tokens. Spans with
+        the same normalized text add up their scores, so an answer several passages
+        agree on beats a single slightly stronger one.
+
+        Returns:
+            Dict with answer, combined score, supporting_passages, and the transcription_id
+            and character offset of its best scoring span, or None without answers
+        """
+        if not passages:
+            return None
+
+        results = self.qa_batcher.map(
+            [{"question": query, "context": passage["text"]} for passage in passages],
+            max_seq_len=QA_MAX_SEQ_LEN,
+            doc_stride=QA_DOC_STRIDE
+        )
 
+        # The same span can be found in overlapping passages; keep its best score
+        best = {}
+        for passage, result in zip(passages, results):
+            answer = result.get("answer", "").strip()
+            if not answer:
+                continue
+            key = (passage["source_id"], passage["offset"] + result["start"])
+            if key not in best or result["score"] > best[key]["score"]:
+                best[key] = {
+                    "answer": answer,
+                    "score": float(result["score"]),
+                    "transcription_id": passage["source_id"],
+                    "offset": passage["offset"] + result["start"]
+                }
+        answers = {}
+        for span in sorted(best.values(), key=lambda candidate: -candidate["score"]):
+            key = " ".join(re.sub(r"[^\w\s]", " ", span["answer"].lower()).split())
+            if key not in answers:
+                # The best span of each answer text gives its source and offset
+                answers[key] = dict(span, supporting_passages=0, score=0.0)
+            answers[key]["score"] += span["score"]
+            answers[key]["supporting_passages"] += 1
+        if not answers:
+            return None
+        return max(answers.values(), key=lambda candidate: candidate["score"])
+
+    def _run_qa_batch(self, items: List[Dict[str, str]], **kwargs) -> List[Dict[str, Any]]:
+        """Answer a batch of question/context pairs in one pipeline call"""
+        results = self.qa_pipeline(
+            question=[item["question"] for item in items],
+            context=[item["context"] for item in items],
+            batch_size=len(items),
+            **kwargs
+        )
+        # The pipeline unwraps single-item batches
+        return [results] if isinstance(results, dict) else list(results)
+
+    def _run_summarizer_batch(self, texts: List[str], **kwargs) -> List[Dict[str, Any]]:
+        """Summarize a batch of texts in one pipeline call"""
+        return list(self.summarizer(texts, batch_size=len(texts), **kwargs))
+
+    @traced()
     def _generate_search_summary(self, query: str, results) -> str:
         """Generate AI summary of search results"""
         if not results:
             return f"No matches found for '{query}'"
         
-        # Combine text from top results
-        combined_text = " ".join([r.text for r in results[:3]])[:1000]
-        
         if self.model_type == "openai":
+            # Combine the most relevant passages from top results
+            combined_text = "\n\n".join(self.context_packer.pack_texts(
+                query, [r.text for r in results[:MAX_CONTEXT_CANDIDATES]], SEARCH_SUMMARY_CONTEXT_TOKENS
+            ))
             prompt = f"Summarize what was found about '{query}' in these recordings: {combined_text}"
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
+            return self.llm_client.chat(
                 messages=[{"role": "user", "content": prompt}],
-                max_tokens=150,
+                model=self.chat_model,
+                max_tokens=SEARCH_SUMMARY_MAX_TOKENS,
                 temperature=0.5
             )
-            return response.choices[0].message.content.strip()
         else:
             return f"Found {len(results)} recordings mentioning '{query}'"
 
@@ -670,6 +913,110 @@ class AIService:
             "total_recordings": len(transcriptions)
         }
 
+    def _summarize_text(self, text: str, summary_type: str) -> str:
+        """Summarize a whole transcription with the active model backend"""
+        if self.model_type == "openai":
+            return self._summarize_with_openai(text, summary_type)
+        elif self.model_type in LOCAL_PIPELINE_MODEL_TYPES:
+            return self._summarize_with_huggingface(text, summary_type)
+        return self._summarize_with_local_model(text, summary_type)
+
+    def _summarize_incrementally(self, text: str, summary_type: str,
+                                 state: Optional[AIAnalysis]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Bring a rolling summary up to date with the transcription text
+
+        The stored state keeps the map-phase partial summaries of the text read so far,
+        which do not depend on summary_type, along with how many characters they cover
+        and a hash of them. When the text still starts with exactly those characters,
+        only the new text goes through the map phase and the final summary is reduced
+        from all partials, so earlier content is never re-compressed into an earlier
+        brief summary. Otherwise (first run, edited text or another model) the whole
+        text is read again.
+
+        Returns:
+            (summary, dict with mode, new_chars and the state to store, None if unchanged)
+        """
+        summarizer = self.map_reduce_summarizer
+        if summarizer is None:
+            # The placeholder local model has no map phase to roll forward
+            return self._summarize_text(text, summary_type), {"mode": "full", "new_chars": len(text), "state": None}
+
+        previous = json.loads(state.result) if state else None
+        if previous and (
+            previous.get("model") != summarizer.namespace
+            or previous["summarized_chars"] > len(text)
+            or _text_hash(text[:previous["summarized_chars"]]) != previous["prefix_hash"]
+        ):
+            previous = None
+
+        if previous:
+            new_chars = len(text) - previous["summarized_chars"]
+            if not new_chars and summary_type in previous["summaries"]:
+                return previous["summaries"][summary_type], {"mode": "unchanged", "new_chars": 0, "state": None}
+            partials, tail_offset = previous["partials"], previous["tail_offset"]
+            summaries = {} if new_chars else previous["summaries"]
+            mode = "delta" if new_chars else "unchanged"
+        else:
+            partials, tail_offset, summaries, mode, new_chars = [], 0, {}, "full", len(text)
+
+        partials, tail_offset = summarizer.extend_partials(partials, text, tail_offset)
+        summary = summarizer.reduce_partials(partials, text[tail_offset:], summary_type)
+        summaries[summary_type] = summary
+
+        return summary, {
+            "mode": mode,
+            "new_chars": new_chars,
+            "state": {
+                "partials": partials,
+                "tail_offset": tail_offset,
+                "summarized_chars": len(text),
+                "prefix_hash": _text_hash(text),
+                "model": summarizer.namespace,
+                "summaries": summaries
+            }
+        }
+
+    def _load_rolling_summary(self, transcription_id: int) -> Optional[AIAnalysis]:
+        # populate_existing: the state is written through its own session, so a copy
+        # already in this session's identity map may be stale
+        return self.db_session.query(AIAnalysis).filter(
+            AIAnalysis.transcription_id == transcription_id,
+            AIAnalysis.analysis_type == ROLLING_SUMMARY_ANALYSIS
+        ).order_by(AIAnalysis.id.desc()).populate_existing().first()
+
+    def _save_rolling_summary(self, transcription_id: int, state: Optional[AIAnalysis], rolling: Dict[str, Any]):
+        """
+        Store the rolling summary state, updating the existing row if there is one
+
+        Uses a separate session, so summarizing never commits changes the caller has
+        pending in the shared one.
+        """
+        if rolling["state"] is None:
+            return
+        result = json.dumps(rolling["state"])
+        session = Session(bind=self.db_session.get_bind())
+        try:
+            row = session.get(AIAnalysis, state.id) if state else None
+            if row:
+                row.result = result
+                row.model_used = rolling["state"]["model"]
+                row.created_at = datetime.utcnow()
+            else:
+                session.add(AIAnalysis(
+                    transcription_id=transcription_id,
+                    analysis_type=ROLLING_SUMMARY_ANALYSIS,
+                    result=result,
+                    model_used=rolling["state"]["model"]
+                ))
+            session.commit()
+        except Exception as e:
+            # The summary is still returned; the next run just has more text to read
+            session.rollback()
+            self.logger.error(f"Error saving rolling summary for transcription {transcription_id}: {str(e)}")
+        finally:
+            session.close()
+
     def _summarize_with_local_model(self, text: str, summary_type: str) -> str:
         """Summarize using local model (placeholder)"""
         if summary_type == "brief":
@@ -679,8 +1026,48 @@ class AIService:
         else:
             return f"• Key points from transcription\n• Contains {len(text.split())} words\n• Generated using local model"
 
+    def _build_map_reduce_summarizer(self) -> Optional[MapReduceSummarizer]:
+        """Map-reduce summarizer wired to the active model backend"""
+        if self.model_type == "openai":
+            return MapReduceSummarizer(
+                self._summarize_chunks_with_openai, self._summarize_text_with_openai,
+                chunk_words=OPENAI_SUMMARY_CHUNK_WORDS,
+                reduce_input_tokens=context_budget(self.chat_model, SUMMARY_MAX_TOKENS),
+                cache=self.chunk_summary_cache, namespace=f"openai:{self.chat_model}"
+            )
+        elif self.model_type in LOCAL_PIPELINE_MODEL_TYPES:
+            return MapReduceSummarizer(
+                self._summarize_chunks_with_huggingface, self._summarize_text_with_huggingface,
+                chunk_words=HUGGINGFACE_SUMMARY_CHUNK_WORDS,
+                reduce_input_tokens=HUGGINGFACE_SUMMARY_INPUT_TOKENS,
+                cache=self.chunk_summary_cache, namespace=f"{self.model_type}:{SUMMARIZATION_MODEL}"
+            )
+        return None
+
+    @traced()
     def _summarize_with_openai(self, text: str, summary_type: str) -> str:
-        """Summarize text using OpenAI"""
+        """Summarize text of any length using OpenAI via map-reduce"""
+        return self.map_reduce_summarizer.summarize(text, summary_type)
+
+    def _summarize_chunks_with_openai(self, chunks: List[str]) -> List[str]:
+        """Map phase: summarize transcript chunks with concurrent OpenAI calls"""
+        def summarize_chunk(chunk: str) -> str:
+            prompt = (
+                "Summarize this part of a transcribed audio recording in a few sentences. "
+                "Keep decisions, names, dates and action items:\n\n" + chunk
+            )
+            return self.llm_client.chat(
+                messages=[{"role": "user", "content": prompt}],
+                model=self.chat_model,
+                max_tokens=CHUNK_SUMMARY_MAX_TOKENS,
+                temperature=0.3
+            )
+        
+        with ThreadPoolExecutor(max_workers=min(SUMMARY_MAP_WORKERS, len(chunks))) as executor:
+            return list(executor.map(summarize_chunk, chunks))
+
+    def _summarize_text_with_openai(self, text: str, summary_type: str) -> str:
+        """Summarize text that fits in one prompt using OpenAI"""
         if summary_type == "brief":
             instruction = "Provide a brief 1-2 sentence summary"
         elif summary_type == "detailed":
@@ -690,20 +1077,36 @@ class AIService:
             
         prompt = f"{instruction} of the following transcription from the user's audio recording:\n\n{text}"
         
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
+        return self.llm_client.chat(
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=300,
+            model=self.chat_model,
+            max_tokens=SUMMARY_MAX_TOKENS,
             temperature=0.5
         )
-        
-        return response.choices[0].message.content.strip()
 
+    @traced()
     def _summarize_with_huggingface(self, text: str, summary_type: str) -> str:
-        """Summarize text using Hugging Face"""
-        # Truncate if too long for the model
-        if len(text) > 1024:
-            text = text[:1024]
-            
-        summary = self.summarizer(text, max_length=150, min_length=30, do_sample=False)
-        return summary[0]['summary_text']
\ No newline at end of file
+        """Summarize text of any length using Hugging Face via map-reduce"""
+        return self.map_reduce_summarizer.summarize(text, summary_type)
+
+    def _summarize_chunks_with_huggingface(self, chunks: List[str]) -> List[str]:
+        """Map phase: summarize transcript chunks in batched pipeline calls"""
+        summaries = self.summarize_batcher.map(
+            chunks, max_length=150, min_length=30, do_sample=False, truncation=True
+        )
+        return [summary['summary_text'] for summary in summaries]
+
+    def _summarize_text_with_huggingface(self, text: str, summary_type: str) -> str:
+        """Summarize text that fits in one model input using Hugging Face"""
+        max_length, min_length = HUGGINGFACE_SUMMARY_LENGTHS.get(summary_type, HUGGINGFACE_SUMMARY_LENGTHS["brief"])
+        summary = self.summarize_batcher(text, max_length=max_length, min_length=min_length, do_sample=False, truncation=True)
+        summary_text = summary['summary_text']
+        if summary_type == "bullet_points":
+            # Rolling summaries feed earlier bullet lists back in; don't nest their markers
+            sentences = [sentence.strip("• \n") for sentence in re.split(r'(?<=[.!?])\s+', summary_text)]
+            sentences = [sentence for sentence in sentences if sentence]
+            return "\n".join(f"• {sentence}" for sentence in sentences)
+        return summary_text
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
@@ -1,8 +1,11 @@
+from tracing import traced
+
 class AudioService:
     def __init__(self):
         self.is_recording = False
         self.audio_data = []
 
+    @traced()
     def start_recording(self):
         if not self.is_recording:
             self.is_recording = True
@@ -10,6 +13,7 @@ class AudioService:
             # Logic to start audio recording
             print("Recording started...")
 
+    @traced()
     def stop_recording(self):
         if self.is_recording:
             self.is_recording = False
@@ -17,18 +21,22 @@ class AudioService:
             print("Recording stopped.")
             return self.audio_data  # Return recorded audio data
 
+    @traced()
     def play_audio(self, audio_file):
         # Logic to play the audio file
         print(f"Playing audio file: {audio_file}")
 
+    @traced()
     def pause_audio(self):
         # Logic to pause audio playback
         print("Audio playback paused.")
 
+    @traced()
     def resume_audio(self):
         # Logic to resume audio playback
         print("Audio playback resumed.")
 
+    @traced()
     def stop_audio(self):
         # Logic to stop audio playback
         print("Audio playback stopped.")
\ No newline at end of file
@@ -0,0 +1,135 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+from tracing import registry
+
+class MicroBatcher:
+    def __init__(self, batch_fn: Callable[..., List[Any]], max_batch_size: int = 16, max_wait_ms: float = 5.0,
+                 name: str = "batcher"):
+        """
+        Dynamic batching of concurrent inference calls
+
+        Requests submitted from any thread are collected for up to max_wait_ms after
+        the first one arrives (or until max_batch_size are waiting), then run through
+        batch_fn in one call per distinct set of keyword arguments. Each caller gets
+        its own result or exception back through a Future; when a batch fails its
+        items are retried one at a time, so a bad input only fails its own caller.
+
+        Args:
+            batch_fn: Called as batch_fn(items, **kwargs); must return one result per item
+            max_batch_size: Largest batch passed to batch_fn
+            max_wait_ms: How long the first request of a batch waits for company
+            name: Used for the worker thread and the tracing span
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.name = name
+        self.logger = logging.getLogger(__name__)
+        self.batches = 0
+        self.items = 0
+        self._queue = queue.Queue()
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name=f"{name}-worker", daemon=True)
+        self._worker.start()
+
+    def submit(self, item: Any, **kwargs) -> Future:
+        """Queue one item; kwargs must be equal for items to share a batch"""
+        if self._closed:
+            raise RuntimeError(f"{self.name} is closed")
+        future = Future()
+        self._queue.put((item, kwargs, future))
+        return future
+
+    def __call__(self, item: Any, **kwargs) -> Any:
+        """Submit an item and wait for its result"""
+        return self.submit(item, **kwargs).result()
+
+    def map(self, items: List[Any], **kwargs) -> List[Any]:
+        """Submit several items at once and wait for all results, in order"""
+        futures = [self.submit(item, **kwargs) for item in items]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Stop the worker after the queued requests are served"""
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0
+        }
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            pending = [first]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                pending.append(request)
+
+            self._dispatch(pending)
+            if stop:
+                return
+
+    def _dispatch(self, pending: List[tuple]):
+        # Items only share a forward pass when called with the same options
+        groups = {}
+        for item, kwargs, future in pending:
+            key = tuple(sorted(kwargs.items()))
+            groups.setdefault(key, (kwargs, []))[1].append((item, future))
+
+        for kwargs, requests in groups.values():
+            try:
+                results = self._run_batch([item for item, _ in requests], kwargs)
+            except Exception as e:
+                if len(requests) == 1:
+                    requests[0][1].set_exception(e)
+                    continue
+                # One bad input must not fail unrelated requests that shared its batch:
+                # run the items one at a time so only the failing item's caller sees the error
+                self.logger.warning(f"{self.name} batch of {len(requests)} failed, retrying items one at a time: {str(e)}")
+                for item, future in requests:
+                    try:
+                        future.set_result(self._run_batch([item], kwargs)[0])
+                    except Exception as item_error:
+                        future.set_exception(item_error)
+                continue
+
+            for (_, future), result in zip(requests, results):
+                future.set_result(result)
+
+    def _run_batch(self, items: List[Any], kwargs: Dict[str, Any]) -> List[Any]:
+        start = time.perf_counter()
+        try:
+            results = self.batch_fn(items, **kwargs)
+            if len(results) != len(items):
+                raise RuntimeError(f"{self.name} returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            self.logger.error(f"Error in {self.name} batch of {len(items)}: {str(e)}")
+            raise
+        finally:
+            registry.observe(f"MicroBatcher.{self.name}", time.perf_counter() - start)
+        self.batches += 1
+        self.items += len(items)
+        return results
@@ -0,0 +1,86 @@
+import logging
+import os
+from typing import Any, Tuple
+
+# Import optional CPU inference libraries with error handling
+try:
+    import torch
+    from transformers import (
+        AutoModelForQuestionAnswering,
+        AutoModelForSeq2SeqLM,
+        AutoTokenizer,
+        pipeline
+    )
+    TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    TRANSFORMERS_AVAILABLE = False
+
+try:
+    from optimum.onnxruntime import ORTModelForQuestionAnswering, ORTModelForSeq2SeqLM
+    OPTIMUM_AVAILABLE = True
+except ImportError:
+    OPTIMUM_AVAILABLE = False
+
+# Same models as the default "huggingface" backend
+SUMMARIZATION_MODEL = "facebook/bart-large-cnn"
+QA_MODEL = "distilbert-base-cased-distilled-squad"
+
+# Backends selectable through AIService(model_type=...)
+CPU_BACKENDS = ("quantized", "onnx")
+
+# Where exported ONNX models are kept so the export only runs once
+ONNX_EXPORT_DIR = os.environ.get("ONNX_EXPORT_DIR", os.path.expanduser("~/.cache/voice-ai/onnx"))
+
+logger = logging.getLogger(__name__)
+
+def load_cpu_pipelines(backend: str, summarization_model: str = SUMMARIZATION_MODEL,
+                       qa_model: str = QA_MODEL) -> Tuple[Any, Any]:
+    """
+    Build summarization and question-answering pipelines optimized for CPU inference
+
+    Args:
+        backend: "quantized" for PyTorch dynamic int8 quantization of the Linear layers,
+            or "onnx" for models exported to and run by ONNX Runtime
+        summarization_model: Hugging Face model id of the summarizer
+        qa_model: Hugging Face model id of the extractive QA model
+
+    Returns:
+        (summarizer, qa_pipeline), drop-in replacements for the transformers pipelines
+    """
+    if not TRANSFORMERS_AVAILABLE:
+        raise ImportError("CPU inference backends need transformers and torch. Install with: pip install transformers torch")
+
+    if backend == "quantized":
+        return (
+            _quantized_pipeline("summarization", AutoModelForSeq2SeqLM, summarization_model),
+            _quantized_pipeline("question-answering", AutoModelForQuestionAnswering, qa_model)
+        )
+    elif backend == "onnx":
+        if not OPTIMUM_AVAILABLE:
+            raise ImportError("The onnx backend needs optimum. Install with: pip install optimum[onnxruntime]")
+        return (
+            _onnx_pipeline("summarization", ORTModelForSeq2SeqLM, summarization_model),
+            _onnx_pipeline("question-answering", ORTModelForQuestionAnswering, qa_model)
+        )
+    raise ValueError(f"Unknown CPU inference backend: {backend}")
+
+def _quantized_pipeline(task: str, model_class, model_name: str):
+    """Pipeline over a model whose Linear layers are dynamically quantized to int8"""
+    model = model_class.from_pretrained(model_name)
+    model.eval()
+    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return pipeline(task, model=quantized, tokenizer=AutoTokenizer.from_pretrained(model_name), device=-1)
+
+def _onnx_pipeline(task: str, model_class, model_name: str):
+    """Pipeline over an ONNX Runtime model, exporting it on first use"""
+    export_path = os.path.join(ONNX_EXPORT_DIR, model_name.replace("/", "__"))
+    if os.path.isdir(export_path):
+        model = model_class.from_pretrained(export_path)
+        tokenizer = AutoTokenizer.from_pretrained(export_path)
+    else:
+        logger.info(f"Exporting {model_name} to ONNX at {export_path}")
+        model = model_class.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model.save_pretrained(export_path)
+        tokenizer.save_pretrained(export_path)
+    return pipeline(task, model=model, tokenizer=tokenizer, device=-1)
@@ -0,0 +1,306 @@
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from tracing import registry
+
+# Import HTTP client with error handling
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+# Any OpenAI-compatible server, e.g. benchmarks/mock_llm_server.py or a local model server
+DEFAULT_API_BASE = "https://api.openai.com/v1"
+
+# Statuses worth retrying; other 4xx errors will fail the same way again
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+class LLMError(Exception):
+    """An LLM call failed after retries, ran out of time or was rejected"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+class CircuitOpenError(LLMError):
+    """Calls are being rejected without trying because the provider keeps failing"""
+
+class LocalLimitTimeout(LLMError):
+    """The deadline passed in our own rate limiter or concurrency cap, before reaching the provider"""
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        """
+        Token-bucket rate limiter
+
+        Args:
+            rate: Tokens added per second; 0 disables limiting
+            capacity: Largest burst allowed after a quiet period
+        """
+        self.rate = rate
+        self.capacity = max(capacity, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, waiting up to timeout seconds for it"""
+        if self.rate <= 0:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Stop calling a failing provider for a while
+
+        After failure_threshold consecutive failed calls the circuit opens and calls
+        are rejected immediately. Once reset_timeout has passed one trial call is let
+        through: success closes the circuit, failure opens it again.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def release(self):
+        """Forget a call that ended without reaching the provider, freeing a half-open trial"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self.failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+class LLMClient:
+    def __init__(self, api_key: str, base_url: Optional[str] = None, timeout: float = 30.0,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 max_concurrency: int = 8, rate_per_second: float = 0.0, burst: int = 10,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Chat completion client shared by every LLM call site
+
+        Requests go over pooled keep-alive connections. Each call has a deadline
+        covering all of its attempts; 429 and 5xx responses, timeouts and connection
+        errors are retried with jittered exponential backoff, honouring Retry-After.
+        A semaphore caps in-flight requests, an optional token bucket caps the request
+        rate, and a circuit breaker fails fast while the provider is down.
+
+        Args:
+            api_key: Bearer token sent to the provider
+            base_url: OpenAI-compatible API root; defaults to OPENAI_API_BASE, then OpenAI
+            timeout: Default deadline per call in seconds, across retries
+            max_retries: Retries after the first attempt
+            backoff_base: First backoff in seconds, doubled per retry
+            backoff_max: Largest backoff in seconds
+            max_concurrency: Requests in flight at once; callers beyond it wait
+            rate_per_second: Requests started per second; 0 for no limit
+            burst: Requests that may start at once under rate_per_second
+            failure_threshold: Consecutive failed calls that open the circuit
+            reset_timeout: Seconds before an open circuit lets a trial call through
+        """
+        if not REQUESTS_AVAILABLE:
+            raise ImportError("LLMClient needs requests. Install with: pip install requests")
+
+        self.api_key = api_key
+        self.base_url = (base_url or os.environ.get("OPENAI_API_BASE") or DEFAULT_API_BASE).rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.logger = logging.getLogger(__name__)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"})
+
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.rate_limiter = TokenBucket(rate_per_second, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self._stats_lock = threading.Lock()
+
+    def chat(self, messages: List[Dict[str, str]], model: str, max_tokens: int = 256,
+             temperature: float = 0.7, timeout: Optional[float] = None, **kwargs) -> str:
+        """
+        Run a chat completion and return the stripped message content
+
+        Args:
+            messages: Chat messages, e.g. [{"role": "user", "content": prompt}]
+            model: Model name
+            max_tokens: Completion token limit
+            temperature: Sampling temperature
+            timeout: Deadline in seconds for the whole call, retries included
+            **kwargs: Passed through in the request body
+
+        Raises:
+            CircuitOpenError: The circuit is open
+            LLMError: The call failed, was rejected or ran past its deadline
+        """
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+        payload.update(kwargs)
+        body = self._post("/chat/completions", payload, timeout or self.timeout)
+        try:
+            return body["choices"][0]["message"]["content"].strip()
+        except (KeyError, IndexError, TypeError):
+            raise LLMError("Malformed chat completion response")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "circuit": self.breaker.state
+            }
+
+    def close(self):
+        self.session.close()
+
+    def _post(self, path: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        with self._stats_lock:
+            self.calls += 1
+
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"Circuit open after {self.breaker.failures} consecutive LLM failures")
+
+        start = time.perf_counter()
+        try:
+            body = self._post_with_retries(path, payload, deadline)
+        except LocalLimitTimeout:
+            # Queued behind our own limits during a burst; says nothing about the provider's health
+            self.breaker.release()
+            with self._stats_lock:
+                self.failures += 1
+            raise
+        except LLMError as e:
+            # Client errors mean a bad request, not an unhealthy provider
+            if e.status is not None and e.status not in RETRYABLE_STATUSES:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            with self._stats_lock:
+                self.failures += 1
+            raise
+        finally:
+            registry.observe("LLMClient.post", time.perf_counter() - start)
+        self.breaker.record_success()
+        return body
+
+    def _post_with_retries(self, path: str, payload: Dict[str, Any], deadline: float) -> Dict[str, Any]:
+        attempt = 0
+        error = None
+        while True:
+            retry_after = None
+            try:
+                try:
+                    response = self._send(path, payload, deadline)
+                except LocalLimitTimeout:
+                    # A retry that runs out of time in our own limits still failed because
+                    # of the provider; report its error so the breaker counts it
+                    if error is not None:
+                        raise error
+                    raise
+                if response.status_code < 400:
+                    return response.json()
+                error = LLMError(
+                    f"LLM request failed with HTTP {response.status_code}: {response.text[:200]}",
+                    response.status_code
+                )
+                if response.status_code not in RETRYABLE_STATUSES:
+                    raise error
+                retry_after = _parse_retry_after(response.headers.get("Retry-After"))
+            except requests.exceptions.RequestException as e:
+                error = LLMError(f"LLM request failed: {str(e)}")
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if time.monotonic() + delay >= deadline:
+                raise error
+            self.logger.warning(f"Retrying LLM request in {delay:.2f}s after: {str(error)}")
+            time.sleep(delay)
+            attempt += 1
+            with self._stats_lock:
+                self.retries += 1
+
+    def _send(self, path: str, payload: Dict[str, Any], deadline: float):
+        if not self.rate_limiter.acquire(timeout=_remaining(deadline)):
+            raise LocalLimitTimeout("Deadline exceeded waiting for the LLM rate limiter")
+        if not self._slots.acquire(timeout=_remaining(deadline)):
+            raise LocalLimitTimeout("Deadline exceeded waiting for an LLM connection slot")
+        try:
+            remaining = _remaining(deadline)
+            if remaining <= 0:
+                raise LocalLimitTimeout("Deadline exceeded before the LLM request was sent")
+            return self.session.post(self.base_url + path, json=payload, timeout=remaining)
+        finally:
+            self._slots.release()
+
+def _remaining(deadline: float) -> float:
+    return max(0.0, deadline - time.monotonic())
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After in seconds; HTTP-date values are ignored in favour of our own backoff"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
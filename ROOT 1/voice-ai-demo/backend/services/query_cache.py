@@ -0,0 +1,155 @@
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from models import Transcription, AudioFile
+
+# Tables whose writes invalidate cached search results
+CACHED_TABLES = (Transcription.__tablename__, AudioFile.__tablename__)
+
+# Every live cache, so model write events can invalidate all of them
+_caches = weakref.WeakSet()
+
+class QueryCache:
+    def __init__(self, max_entries: int = 1024, max_ids_per_entry: int = 5000):
+        """
+        LRU cache of search results stored as id lists
+
+        Entries are tagged with the generation counters of the tables they were read
+        from; any insert, update or delete on those tables bumps the counter, so stale
+        entries are never returned and simply age out of the LRU order.
+
+        Generations are bumped by SQLAlchemy events in this process only. Writes made
+        by another worker process or outside the ORM do not invalidate entries here,
+        so run a single process or clear the cache when sharing a database.
+
+        Args:
+            max_entries: Maximum number of cached queries
+            max_ids_per_entry: Results larger than this are not cached
+        """
+        self.max_entries = max_entries
+        self.max_ids_per_entry = max_ids_per_entry
+        self._entries = OrderedDict()
+        self._generations = {table: 0 for table in CACHED_TABLES}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        _caches.add(self)
+
+    def make_key(self, kind: str, query: Optional[str], filters: Optional[Dict[str, Any]] = None) -> Tuple:
+        """Build a cache key from the search kind, lowercased query text and filters"""
+        # Searches use case-insensitive LIKE, so case is the only safe normalization here;
+        # callers that tokenize the query should collapse whitespace before building the key
+        normalized_query = (query or "").lower()
+        normalized_filters = tuple(sorted(
+            (name, self._freeze(value)) for name, value in (filters or {}).items() if value is not None
+        ))
+        return (kind, normalized_query, normalized_filters)
+
+    def get(self, key: Tuple, tables: Iterable[str]) -> Optional[Any]:
+        """Return the cached value for key if none of its tables changed since it was stored"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == self._generation_of(tables):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key: Tuple, generation: Tuple[int, ...], value: Any, size: int = 0):
+        """
+        Store a value; generation must be taken with generation() before the value was
+        read, so a write that lands during the read leaves the entry already stale
+
+        Args:
+            key: Key from make_key
+            generation: Table generations observed before reading the value
+            value: Value to cache
+            size: Number of ids held by the value
+        """
+        if self.max_entries <= 0 or size > self.max_ids_per_entry:
+            return
+        with self._lock:
+            self._entries[key] = (generation, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """Current generation counters for the given tables"""
+        with self._lock:
+            return self._generation_of(tables)
+
+    def invalidate(self, table: str):
+        """Mark every entry read from table as stale"""
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "generations": dict(self._generations)
+            }
+
+    def _generation_of(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._generations.get(table, 0) for table in tables)
+
+    def _freeze(self, value: Any) -> Any:
+        """Make filter values hashable"""
+        if isinstance(value, (list, tuple, set)):
+            return tuple(sorted(str(item) for item in value))
+        if isinstance(value, dict):
+            return tuple(sorted((k, self._freeze(v)) for k, v in value.items()))
+        return str(value) if not isinstance(value, (int, float, str, bool)) else value
+
+def invalidate_tables(*tables: str):
+    """Invalidate cached results for tables in every cache, e.g. after bulk Core inserts"""
+    for cache in list(_caches):
+        for table in tables:
+            cache.invalidate(table)
+
+def _on_row_write(table: str):
+    def listener(mapper, connection, target):
+        invalidate_tables(table)
+        # Invalidate again on commit: another session may have re-cached
+        # pre-commit results between this flush and the commit
+        session = object_session(target)
+        if session is not None:
+            session.info.setdefault("query_cache_tables", set()).add(table)
+    return listener
+
+def _on_commit(session):
+    tables = session.info.pop("query_cache_tables", None)
+    if tables:
+        invalidate_tables(*tables)
+
+def _on_bulk_write(context):
+    invalidate_tables(context.mapper.local_table.name)
+
+for _model in (Transcription, AudioFile):
+    for _event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event_name, _on_row_write(_model.__tablename__))
+
+event.listen(Session, "after_commit", _on_commit)
+event.listen(Session, "after_bulk_update", _on_bulk_write)
+event.listen(Session, "after_bulk_delete", _on_bulk_write)
+
+# Process-wide cache shared by every SearchService unless one is passed explicitly
+default_cache = QueryCache()
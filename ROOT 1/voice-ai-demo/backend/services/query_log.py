@@ -0,0 +1,261 @@
+import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, insert
+
+from models import SearchQuery
+
+# Stages broken out in SearchQuery, mapped to their column names
+STAGE_COLUMNS = {
+    "db": "db_time",
+    "ranking": "ranking_time",
+    "llm": "llm_time",
+    "serialization": "serialization_time"
+}
+
+REPORT_PERCENTILES = (50, 95, 99)
+
+# The profile of the query currently running on this thread
+_local = threading.local()
+
+class QueryProfile:
+    def __init__(self, query_text: str, source: str):
+        """Latency of one query, broken down by stage"""
+        self.query_text = query_text or ""
+        self.source = source
+        self.results_count = 0
+        self.stage_times = {stage: 0.0 for stage in STAGE_COLUMNS}
+        self._active_stages = set()
+        self.started_at = datetime.utcnow()
+        self._start = time.perf_counter()
+        self.execution_time = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Add the time spent in the block to the named stage"""
+        # A stage nested in the same stage (e.g. a route timing a service that times itself) is counted once
+        if name in self._active_stages:
+            yield self
+            return
+        self._active_stages.add(name)
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self._active_stages.discard(name)
+            self.stage_times[name] = self.stage_times.get(name, 0.0) + time.perf_counter() - start
+
+    def finish(self):
+        self.execution_time = time.perf_counter() - self._start
+
+    def to_record(self) -> Dict[str, Any]:
+        record = {
+            "query_text": self.query_text[:500],
+            "source": self.source,
+            "results_count": self.results_count,
+            "execution_time": self.execution_time,
+            "created_at": self.started_at
+        }
+        for stage, column in STAGE_COLUMNS.items():
+            record[column] = self.stage_times.get(stage, 0.0)
+        return record
+
+class QueryLogWriter:
+    def __init__(self, session_factory=None, batch_size: int = 100, flush_interval: float = 2.0,
+                 max_queue_size: int = 10000):
+        """
+        Batched background writer for SearchQuery rows
+
+        Records are queued without blocking the caller and inserted by a daemon thread
+        in batches. Nothing is recorded until a session factory is configured, and
+        records are dropped (and counted) when the queue is full.
+
+        Args:
+            session_factory: Callable returning a new database session
+            batch_size: Maximum rows per INSERT
+            flush_interval: Maximum seconds a record waits before being written
+            max_queue_size: Bound on queued records
+        """
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(__name__)
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._session_factory = None
+        self._thread = None
+        self._lock = threading.Lock()
+        if session_factory is not None:
+            self.configure(session_factory)
+
+    def configure(self, session_factory):
+        """Set the session factory and start the writer thread"""
+        with self._lock:
+            self._session_factory = session_factory
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="query-log-writer", daemon=True)
+                self._thread.start()
+
+    @property
+    def enabled(self) -> bool:
+        return self._session_factory is not None
+
+    def submit(self, record: Dict[str, Any]):
+        """Queue a record for writing; never blocks"""
+        if not self.enabled:
+            return
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 5.0):
+        """Wait until every record queued so far has been written"""
+        if not self.enabled:
+            return
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def _run(self):
+        batch = []
+        deadline = None
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, dict):
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            flush_requested = isinstance(item, threading.Event)
+            if batch and (flush_requested or item is None or len(batch) >= self.batch_size):
+                self._write(batch)
+                batch = []
+                deadline = None
+            if flush_requested:
+                item.set()
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        session = self._session_factory()
+        try:
+            session.execute(insert(SearchQuery), batch)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            self.logger.error(f"Error writing {len(batch)} query log records: {str(e)}")
+        finally:
+            session.close()
+
+# Process-wide writer; call default_writer.configure(session_factory) to enable logging
+default_writer = QueryLogWriter()
+
+@contextmanager
+def profile_query(query_text: str, source: str, writer: Optional[QueryLogWriter] = None):
+    """
+    Profile a query and log it when the block exits
+
+    Nested calls on the same thread join the outermost profile, so a route that
+    calls into services produces a single SearchQuery row covering every stage.
+    """
+    outer = getattr(_local, "profile", None)
+    if outer is not None:
+        yield outer
+        return
+
+    profile = QueryProfile(query_text, source)
+    _local.profile = profile
+    try:
+        yield profile
+    finally:
+        _local.profile = None
+        profile.finish()
+        (writer or default_writer).submit(profile.to_record())
+
+def latency_report(db_session, since: Optional[datetime] = None, source: Optional[str] = None,
+                   slowest: int = 10) -> Dict[str, Any]:
+    """
+    Summarize logged query latency
+
+    Args:
+        db_session: Database session
+        since: Only include queries logged after this time
+        source: Only include queries from this entry point
+        slowest: Number of slowest queries to list
+
+    Returns:
+        Dict with query count, p50/p95/p99 of total and per-stage latency, and the slowest
+        queries. Each stage's percentiles only cover the queries that ran that stage,
+        counted under "count".
+    """
+    def scoped(query):
+        if since is not None:
+            query = query.filter(SearchQuery.created_at >= since)
+        if source:
+            query = query.filter(SearchQuery.source == source)
+        return query.filter(SearchQuery.execution_time.isnot(None))
+
+    total = scoped(db_session.query(func.count(SearchQuery.id))).scalar() or 0
+
+    def percentiles(column, *conditions) -> Dict[str, Optional[float]]:
+        # Nearest-rank percentiles read with ORDER BY ... OFFSET, so only single rows are fetched
+        count = total
+        if conditions:
+            count = scoped(db_session.query(func.count(SearchQuery.id))).filter(*conditions).scalar() or 0
+        values = {"count": count}
+        for p in REPORT_PERCENTILES:
+            if not count:
+                values[f"p{p}"] = None
+                continue
+            offset = max(0, -(-p * count // 100) - 1)
+            values[f"p{p}"] = scoped(db_session.query(column)).filter(*conditions).order_by(
+                column
+            ).offset(offset).limit(1).scalar()
+        return values
+
+    def stage_percentiles(column) -> Dict[str, Optional[float]]:
+        # Stages a query never ran are logged as 0.0; a search has no LLM time, so
+        # including those rows would report mostly zeros
+        return percentiles(column, column > 0)
+
+    slowest_queries = scoped(db_session.query(SearchQuery)).order_by(
+        SearchQuery.execution_time.desc()
+    ).limit(slowest).all()
+
+    return {
+        "query_count": total,
+        "since": since.isoformat() if since else None,
+        "source": source,
+        "execution_time": percentiles(SearchQuery.execution_time),
+        "stages": {
+            stage: stage_percentiles(getattr(SearchQuery, column)) for stage, column in STAGE_COLUMNS.items()
+        },
+        "slowest_queries": [
+            {
+                "query_text": q.query_text,
+                "source": q.source,
+                "results_count": q.results_count,
+                "execution_time": q.execution_time,
+                "stages": {stage: getattr(q, column) for stage, column in STAGE_COLUMNS.items()},
+                "created_at": q.created_at.isoformat() if q.created_at else None
+            }
+            for q in slowest_queries
+        ],
+        "timestamp": datetime.now().isoformat()
+    }
+
+def report_since_minutes(db_session, minutes: Optional[int], **kwargs) -> Dict[str, Any]:
+    """latency_report over the last `minutes` minutes (all time when minutes is None)"""
+    since = datetime.utcnow() - timedelta(minutes=minutes) if minutes else None
+    return latency_report(db_session, since=since, **kwargs)
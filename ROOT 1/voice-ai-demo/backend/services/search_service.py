@@ -1,23 +1,324 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, or_, case, literal
+
+from models import Transcription, AudioFile
+from query_cache import QueryCache, default_cache
+from query_log import profile_query
+from tracing import traced
+
+# Advanced search paging limits
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Upper bound on query terms turned into LIKE clauses
+MAX_QUERY_TERMS = 8
+
+# Largest IN (...) list used when reloading cached ids
+ID_LOAD_CHUNK_SIZE = 500
+
+TRANSCRIPTION_TABLES = (Transcription.__tablename__,)
+AUDIO_FILE_TABLES = (AudioFile.__tablename__,)
+JOINED_TABLES = (Transcription.__tablename__, AudioFile.__tablename__)
+
 class SearchService:
-    def __init__(self, db_session):
+    def __init__(self, db_session, cache: Optional[QueryCache] = default_cache):
+        """
+        Args:
+            db_session: Database session for accessing transcriptions
+            cache: Result cache shared across services; None disables caching
+        """
         self.db_session = db_session
+        self.cache = cache
 
+    @traced()
     def search_transcriptions(self, query: str):
-        results = self.db_session.query(Transcription).filter(Transcription.text.ilike(f'%{query}%')).all()
+        with profile_query(query, "search.search_transcriptions") as profile, profile.stage("db"):
+            ids = self._cached_ids("search_transcriptions", query, TRANSCRIPTION_TABLES)
+            if ids is not None:
+                results = self._load_by_ids(Transcription, ids)
+            else:
+                generation = self.cache.generation(TRANSCRIPTION_TABLES) if self.cache else None
+                results = self.db_session.query(Transcription).filter(Transcription.text.ilike(f'%{query}%')).all()
+                self._store_ids("search_transcriptions", query, generation, results)
+            profile.results_count = len(results)
         return results
 
+    @traced()
     def filter_by_date(self, start_date: str, end_date: str):
-        results = self.db_session.query(Transcription).filter(Transcription.created_at.between(start_date, end_date)).all()
+        with profile_query(f"{start_date}..{end_date}", "search.filter_by_date") as profile, profile.stage("db"):
+            results = self.db_session.query(Transcription).filter(Transcription.created_at.between(start_date, end_date)).all()
+            profile.results_count = len(results)
         return results
 
+    @traced()
     def get_audio_files(self):
         results = self.db_session.query(AudioFile).all()
         return results
 
+    @traced()
     def search_audio_files(self, query: str):
-        results = self.db_session.query(AudioFile).filter(AudioFile.filename.ilike(f'%{query}%')).all()
+        with profile_query(query, "search.search_audio_files") as profile, profile.stage("db"):
+            ids = self._cached_ids("search_audio_files", query, AUDIO_FILE_TABLES)
+            if ids is not None:
+                results = self._load_by_ids(AudioFile, ids)
+            else:
+                generation = self.cache.generation(AUDIO_FILE_TABLES) if self.cache else None
+                results = self.db_session.query(AudioFile).filter(AudioFile.filename.ilike(f'%{query}%')).all()
+                self._store_ids("search_audio_files", query, generation, results)
+            profile.results_count = len(results)
         return results
 
-    def advanced_search(self, query: str, filters: dict):
-        # Implement advanced search logic based on filters
-        pass
\ No newline at end of file
+    @traced()
+    def advanced_search(self, query: str, filters: dict = None) -> Dict[str, Any]:
+        """
+        Search transcriptions with text matching, metadata filters and keyset pagination
+        in a single SQL query
+
+        The indexes serve the metadata filters and the recency order only. Text matching
+        is a case-insensitive substring match (ILIKE '%term%') that no index can serve,
+        and relevance is a per-term CASE score, so a query scans and scores every row
+        left after the metadata filters, again for each page. At larger corpus sizes
+        back it with a full-text index (SQLite FTS5, PostgreSQL tsvector with GIN).
+
+        Args:
+            query: Free text; transcriptions matching any term are returned
+            filters: Optional dict with any of:
+                start_date, end_date: created_at range (datetime or ISO string)
+                language, model_used, format: value or list of values
+                min_confidence, max_confidence: confidence_score thresholds
+                min_duration, max_duration: audio duration in seconds
+                sort: "relevance" (default when a query is given) or "recency"
+                limit: page size (default 20, max 100)
+                cursor: opaque cursor returned as next_cursor by the previous page
+
+        Returns:
+            Dict with the page of Transcription rows, next_cursor and has_more
+        """
+        with profile_query(query, "search.advanced_search") as profile, profile.stage("db"):
+            page = self._advanced_search(query, filters or {})
+            profile.results_count = len(page["results"])
+        return page
+
+    def _advanced_search(self, query: str, filters: Dict[str, Any]) -> Dict[str, Any]:
+        terms = self._query_terms(query)
+        sort = filters.get("sort") or ("relevance" if terms else "recency")
+        if sort not in ("relevance", "recency"):
+            raise ValueError(f"Unsupported sort order: {sort}")
+        if sort == "relevance" and not terms:
+            sort = "recency"
+        limit = max(1, min(int(filters.get("limit") or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
+        tables = JOINED_TABLES if self._needs_audio_join(filters) else TRANSCRIPTION_TABLES
+        cache_key = None
+        if self.cache:
+            normalized_query = " ".join((query or "").split())
+            cache_key = self.cache.make_key("advanced_search", normalized_query, dict(filters, sort=sort, limit=limit))
+            cached = self.cache.get(cache_key, tables)
+            if cached is not None:
+                page = {key: value for key, value in cached.items() if key != "ids"}
+                return dict(page, results=self._load_by_ids(Transcription, cached["ids"]))
+            generation = self.cache.generation(tables)
+
+        relevance = self._relevance_expression(query, terms) if sort == "relevance" else None
+        if relevance is not None:
+            db_query = self.db_session.query(Transcription, relevance.label("relevance"))
+        else:
+            db_query = self.db_session.query(Transcription)
+
+        db_query, conditions = self._apply_filters(db_query, terms, filters)
+
+        # Keyset pagination: continue strictly after the last row of the previous page
+        sort_columns = [Transcription.created_at, Transcription.id]
+        if relevance is not None:
+            sort_columns.insert(0, relevance)
+        if filters.get("cursor"):
+            cursor_values = self._decode_cursor(filters["cursor"], sort)
+            conditions.append(self._keyset_after(sort_columns, cursor_values))
+
+        if conditions:
+            db_query = db_query.filter(and_(*conditions))
+        rows = db_query.order_by(*[column.desc() for column in sort_columns]).limit(limit + 1).all()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if relevance is not None:
+            results = [transcription for transcription, _ in rows]
+            scores = [score for _, score in rows]
+        else:
+            results = rows
+            scores = None
+
+        next_cursor = None
+        if has_more and results:
+            last = results[-1]
+            next_cursor = self._encode_cursor(sort, last, scores[-1] if scores else None)
+
+        page = {
+            "relevance_scores": scores,
+            "next_cursor": next_cursor,
+            "has_more": has_more,
+            "sort": sort
+        }
+        if cache_key is not None:
+            self.cache.set(cache_key, generation, dict(page, ids=[trans.id for trans in results]), len(results))
+        return dict(page, results=results)
+
+    def iter_transcriptions(self, query: str, filters: dict = None, batch_size: int = 500):
+        """
+        Stream matching transcriptions newest first without materializing the result set
+
+        Args:
+            query: Free text; transcriptions matching any term are returned
+            filters: Same metadata filters as advanced_search; "cursor" resumes after
+                a previous page, "sort" and "limit" are ignored
+            batch_size: Number of rows fetched from the DB cursor at a time
+
+        Returns:
+            Lazy iterable of Transcription rows ordered by (created_at, id) descending
+        """
+        filters = filters or {}
+        terms = self._query_terms(query)
+        db_query = self.db_session.query(Transcription)
+
+        db_query, conditions = self._apply_filters(db_query, terms, filters)
+
+        sort_columns = [Transcription.created_at, Transcription.id]
+        if filters.get("cursor"):
+            conditions.append(self._keyset_after(sort_columns, self._decode_cursor(filters["cursor"], "recency")))
+        if conditions:
+            db_query = db_query.filter(and_(*conditions))
+
+        # The query is built (and the cursor validated) eagerly; rows are only fetched on iteration
+        return db_query.order_by(*[column.desc() for column in sort_columns]).yield_per(batch_size)
+
+    def _cached_ids(self, kind: str, query: str, tables: tuple) -> Optional[List[int]]:
+        """Look up the id list cached for a search method and query"""
+        if not self.cache:
+            return None
+        return self.cache.get(self.cache.make_key(kind, query), tables)
+
+    def _store_ids(self, kind: str, query: str, generation: Optional[tuple], rows: list):
+        """Cache the ids of rows read under the given table generation"""
+        if self.cache:
+            self.cache.set(self.cache.make_key(kind, query), generation, [row.id for row in rows], len(rows))
+
+    def _load_by_ids(self, model, ids: List[int]) -> list:
+        """Load rows by primary key, preserving the order of ids"""
+        rows_by_id = {}
+        for start in range(0, len(ids), ID_LOAD_CHUNK_SIZE):
+            chunk = ids[start:start + ID_LOAD_CHUNK_SIZE]
+            for row in self.db_session.query(model).filter(model.id.in_(chunk)).all():
+                rows_by_id[row.id] = row
+        # Rows deleted since caching are skipped; deletes also invalidate the cache
+        return [rows_by_id[row_id] for row_id in ids if row_id in rows_by_id]
+
+    def _query_terms(self, query: Optional[str]) -> List[str]:
+        """Split a query into unique lowercase terms"""
+        if not query:
+            return []
+        terms = []
+        for word in query.lower().split():
+            if word not in terms:
+                terms.append(word)
+        return terms[:MAX_QUERY_TERMS]
+
+    def _text_match(self, value: str):
+        """Case-insensitive substring match on the transcription text; not index-backed"""
+        escaped = value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return Transcription.text.ilike(f"%{escaped}%", escape="\\")
+
+    def _relevance_expression(self, query: str, terms: List[str]):
+        """SQL expression scoring one point per matched term, plus a bonus for the exact phrase"""
+        score = literal(0)
+        for term in terms:
+            score = score + case((self._text_match(term), 1), else_=0)
+        if len(terms) > 1:
+            score = score + case((self._text_match(" ".join(query.lower().split())), 2), else_=0)
+        return score
+
+    def _apply_filters(self, db_query, terms: List[str], filters: Dict[str, Any]):
+        """Join audio_files when needed and collect text and metadata conditions"""
+        conditions = self._filter_conditions(filters)
+        if terms:
+            conditions.append(or_(*[self._text_match(term) for term in terms]))
+        if self._needs_audio_join(filters):
+            db_query = db_query.join(AudioFile, Transcription.audio_file_id == AudioFile.id)
+        return db_query, conditions
+
+    def _filter_conditions(self, filters: Dict[str, Any]) -> list:
+        """Translate metadata filters into SQL conditions"""
+        conditions = []
+
+        if filters.get("start_date"):
+            conditions.append(Transcription.created_at >= self._parse_datetime(filters["start_date"]))
+        if filters.get("end_date"):
+            conditions.append(Transcription.created_at <= self._parse_datetime(filters["end_date"]))
+
+        for key, column in (("language", Transcription.language),
+                            ("model_used", Transcription.model_used),
+                            ("format", AudioFile.format)):
+            value = filters.get(key)
+            if not value:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(column.in_(list(value)))
+            else:
+                conditions.append(column == value)
+
+        if filters.get("min_confidence") is not None:
+            conditions.append(Transcription.confidence_score >= float(filters["min_confidence"]))
+        if filters.get("max_confidence") is not None:
+            conditions.append(Transcription.confidence_score <= float(filters["max_confidence"]))
+        if filters.get("min_duration") is not None:
+            conditions.append(AudioFile.duration >= float(filters["min_duration"]))
+        if filters.get("max_duration") is not None:
+            conditions.append(AudioFile.duration <= float(filters["max_duration"]))
+
+        return conditions
+
+    def _needs_audio_join(self, filters: Dict[str, Any]) -> bool:
+        """Whether any filter targets the audio_files table"""
+        return bool(filters.get("format")) or any(
+            filters.get(key) is not None for key in ("min_duration", "max_duration")
+        )
+
+    def _keyset_after(self, columns: list, values: list):
+        """Condition selecting rows that sort after `values` in descending column order"""
+        column, value = columns[0], values[0]
+        if len(columns) == 1:
+            return column < value
+        return or_(column < value, and_(column == value, self._keyset_after(columns[1:], values[1:])))
+
+    def _encode_cursor(self, sort: str, transcription, score=None) -> str:
+        """Encode the sort key of the last row on a page as an opaque cursor"""
+        payload = {
+            "sort": sort,
+            "created_at": transcription.created_at.isoformat(),
+            "id": transcription.id
+        }
+        if sort == "relevance":
+            payload["score"] = score
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    def _decode_cursor(self, cursor: str, sort: str) -> list:
+        """Decode a cursor into sort key values matching the current sort order"""
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+            values = [datetime.fromisoformat(payload["created_at"]), int(payload["id"])]
+            if sort == "relevance":
+                values.insert(0, int(payload["score"]))
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f"Invalid search cursor: {cursor}") from e
+        if payload.get("sort") != sort:
+            raise ValueError("Search cursor does not match the requested sort order")
+        return values
+
+    def _parse_datetime(self, value) -> datetime:
+        """Accept datetimes or ISO formatted strings"""
+        if isinstance(value, datetime):
+            return value
+        return datetime.fromisoformat(value)
@@ -0,0 +1,62 @@
+import copy
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+from tracing import registry
+
+class SingleFlight:
+    def __init__(self, name: str = "single_flight"):
+        """
+        Coalesce identical concurrent calls into one computation
+
+        The first caller for a key runs the function; callers arriving with the same
+        key while it is in flight wait for it and get the same result or exception.
+        Every caller receives its own deep copy, so one request mutating its result
+        cannot leak into another. Nothing is cached once the call completes.
+
+        Args:
+            name: Used for the tracing span timing how long coalesced callers wait
+        """
+        self.name = name
+        self.calls = 0
+        self.shared = 0
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return fn(), or the result of an identical call already in flight"""
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+            else:
+                self.shared += 1
+
+        if leader:
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    del self._in_flight[key]
+            return copy.deepcopy(future.result())
+
+        start = time.perf_counter()
+        try:
+            return copy.deepcopy(future.result())
+        finally:
+            registry.observe(f"SingleFlight.{self.name}.wait", time.perf_counter() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "shared": self.shared,
+                "in_flight": len(self._in_flight)
+            }
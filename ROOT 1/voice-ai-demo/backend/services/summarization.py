@@ -0,0 +1,165 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+
+from context_packer import ContextPacker, estimate_tokens
+
+# Reduce rounds before the final summary is forced, however long the partials are
+MAX_REDUCE_DEPTH = 3
+
+class ChunkSummaryCache:
+    def __init__(self, max_entries: int = 4096):
+        """
+        LRU cache of map-phase chunk summaries
+
+        Chunk summaries do not depend on the requested summary_type, so summarizing
+        the same recording again in another style only pays for the reduce step.
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, namespace: str, chunk: str) -> str:
+        return f"{namespace}:{hashlib.sha1(chunk.encode('utf-8')).hexdigest()}"
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            summary = self._entries.get(key)
+            if summary is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return summary
+
+    def set(self, key: str, summary: str):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = summary
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+class MapReduceSummarizer:
+    def __init__(self, map_fn: Callable[[List[str]], List[str]], reduce_fn: Callable[[str, str], str],
+                 chunk_words: int = 600, reduce_input_tokens: int = 2000,
+                 cache: Optional[ChunkSummaryCache] = None, namespace: str = ""):
+        """
+        Hierarchical map-reduce summarization for transcriptions longer than one model input
+
+        Args:
+            map_fn: Summarizes a list of chunks, returning one summary per chunk; backends
+                batch or parallelize the list as they see fit
+            reduce_fn: Produces the final summary of (text, summary_type)
+            chunk_words: Words per map chunk, sized to the backend's input limit
+            reduce_input_tokens: Token budget of the final reduce input; partial summaries
+                longer than this are summarized again, then trimmed if still too long
+            cache: Chunk summary cache shared across calls
+            namespace: Cache namespace, e.g. the backend and model name
+        """
+        self.map_fn = map_fn
+        self.reduce_fn = reduce_fn
+        self.chunker = ContextPacker(passage_words=chunk_words, overlap_words=0)
+        self.reduce_input_tokens = reduce_input_tokens
+        self.cache = cache
+        self.namespace = namespace
+
+    def chunk(self, text: str) -> List[str]:
+        return [passage["text"] for passage in self.chunker.split_passages(None, text)]
+
+    def summarize(self, text: str, summary_type: str) -> str:
+        """Summarize text of any length in the requested summary_type"""
+        return self.reduce_fn(self.condense(text), summary_type)
+
+    def extend_partials(self, partials: List[str], text: str, tail_offset: int) -> Tuple[List[str], int]:
+        """
+        Rolling map phase for text that keeps growing
+
+        partials summarize text[:tail_offset]. The complete chunks of text[tail_offset:]
+        are summarized and appended; the last, possibly incomplete chunk is left as the
+        new tail so it can grow before being summarized. Partial summaries do not depend
+        on the summary_type, and once they outgrow reduce_input_tokens they are
+        summarized again among themselves.
+
+        Returns:
+            (partials, tail_offset) covering the whole text
+        """
+        chunks = self.chunker.split_passages(None, text[tail_offset:])
+        if len(chunks) > 1:
+            partials = partials + self.map_chunks([chunk["text"] for chunk in chunks[:-1]])
+            tail_offset += chunks[-1]["offset"]
+
+        depth = 0
+        while len(partials) > 1 and depth < MAX_REDUCE_DEPTH and \
+                estimate_tokens("\n".join(partials)) > self.reduce_input_tokens:
+            partials = self.map_chunks(self.chunk("\n".join(partials)))
+            depth += 1
+        return partials, tail_offset
+
+    def reduce_partials(self, partials: List[str], tail: str, summary_type: str) -> str:
+        """Final summary of partial summaries plus the not yet summarized tail"""
+        return self.reduce_fn(self.fit([part for part in partials + [tail] if part.strip()]), summary_type)
+
+    def condense(self, text: str) -> str:
+        """
+        Map phase: reduce text to partial summaries that fit reduce_input_tokens
+
+        Text that already fits is returned unchanged. When MAX_REDUCE_DEPTH rounds
+        still leave too much, every partial summary is trimmed by the same share so
+        the whole recording stays represented in the reduce input.
+        """
+        parts = [text]
+        chunks = self.chunk(text)
+        depth = 0
+        while len(chunks) > 1 and depth < MAX_REDUCE_DEPTH:
+            parts = self.map_chunks(chunks)
+            text = "\n".join(parts)
+            if estimate_tokens(text) <= self.reduce_input_tokens:
+                break
+            chunks = self.chunk(text)
+            depth += 1
+        return self.fit(parts)
+
+    def fit(self, parts: List[str]) -> str:
+        """Join parts, trimming each proportionally when together they exceed reduce_input_tokens"""
+        text = "\n".join(parts)
+        tokens = estimate_tokens(text)
+        if tokens <= self.reduce_input_tokens:
+            return text
+
+        words = [part.split() for part in parts]
+        ratio = self.reduce_input_tokens / tokens
+        while ratio > 0.01:
+            text = "\n".join(" ".join(part[:max(1, int(len(part) * ratio))]) for part in words)
+            if estimate_tokens(text) <= self.reduce_input_tokens:
+                return text
+            ratio *= 0.9
+
+        # More parts than the budget has room for: keep the head
+        words = text.split()
+        while words and estimate_tokens(" ".join(words)) > self.reduce_input_tokens:
+            words = words[:int(len(words) * 0.9)]
+        return " ".join(words)
+
+    def map_chunks(self, chunks: List[str]) -> List[str]:
+        """Summarize chunks, serving repeated chunks from the cache"""
+        summaries = [None] * len(chunks)
+        missing = []
+        for index, chunk in enumerate(chunks):
+            cached = self.cache.get(self.cache.key(self.namespace, chunk)) if self.cache else None
+            if cached is None:
+                missing.append(index)
+            else:
+                summaries[index] = cached
+
+        if missing:
+            fresh = self.map_fn([chunks[index] for index in missing])
+            for index, summary in zip(missing, fresh):
+                summaries[index] = summary
+                if self.cache:
+                    self.cache.set(self.cache.key(self.namespace, chunks[index]), summary)
+        return summaries
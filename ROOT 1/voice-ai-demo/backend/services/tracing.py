@@ -0,0 +1,181 @@
+import cProfile
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Set TRACING_ENABLED=0 to turn spans into no-ops
+TRACING_ENABLED = os.environ.get("TRACING_ENABLED", "1") != "0"
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """Cumulative-bucket latency histogram in the Prometheus sense"""
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+
+    def observe(self, value: float, error: bool = False):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        if error:
+            self.errors += 1
+
+class MetricsRegistry:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """In-process span duration histograms, one per span name"""
+        self.buckets = buckets
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, error: bool = False):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds, error)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Count, error count, sum and mean duration per span"""
+        with self._lock:
+            return {
+                name: {
+                    "count": h.count,
+                    "errors": h.errors,
+                    "sum": h.total,
+                    "mean": h.total / h.count if h.count else 0.0
+                }
+                for name, h in self._histograms.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self) -> str:
+        """Render every histogram in the Prometheus text exposition format"""
+        lines = [
+            "# HELP span_duration_seconds Duration of instrumented spans",
+            "# TYPE span_duration_seconds histogram"
+        ]
+        errors = [
+            "# HELP span_errors_total Spans that exited with an exception",
+            "# TYPE span_errors_total counter"
+        ]
+        with self._lock:
+            for name in sorted(self._histograms):
+                h = self._histograms[name]
+                label = self._escape(name)
+                cumulative = 0
+                for bound, count in zip(self.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f'span_duration_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {h.count}')
+                lines.append(f'span_duration_seconds_sum{{span="{label}"}} {h.total}')
+                lines.append(f'span_duration_seconds_count{{span="{label}"}} {h.count}')
+                errors.append(f'span_errors_total{{span="{label}"}} {h.errors}')
+        return "\n".join(lines + errors) + "\n"
+
+    def _escape(self, value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+# Process-wide registry exported by the /metrics endpoint
+registry = MetricsRegistry()
+
+@contextmanager
+def span(name: str):
+    """Time the block and record it under name"""
+    if not TRACING_ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    error = False
+    try:
+        yield
+    except BaseException:
+        error = True
+        raise
+    finally:
+        registry.observe(name, time.perf_counter() - start, error)
+
+def traced(name: Optional[str] = None):
+    """Decorator recording each call as a span named name (default: Class.method)"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACING_ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            error = False
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                error = True
+                raise
+            finally:
+                registry.observe(span_name, time.perf_counter() - start, error)
+        return wrapper
+    return decorator
+
+class RequestProfiler:
+    def __init__(self, output_dir: Optional[str] = None, sample_rate: Optional[float] = None,
+                 header: str = "X-Profile"):
+        """
+        Optional cProfile capture for individual requests
+
+        A request is profiled when it carries the trigger header or, when a sample
+        rate is set, at random. Stats are dumped as .prof files loadable with pstats
+        or snakeviz.
+
+        Args:
+            output_dir: Directory for .prof files (PROFILE_DIR, default /tmp/voice-ai-profiles)
+            sample_rate: Fraction of requests profiled without the header (PROFILE_SAMPLE_RATE, default 0)
+            header: Request header that triggers profiling
+        """
+        self.output_dir = output_dir or os.environ.get("PROFILE_DIR", "/tmp/voice-ai-profiles")
+        if sample_rate is None:
+            sample_rate = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+        self.sample_rate = sample_rate
+        self.header = header
+        self.logger = logging.getLogger(__name__)
+
+    def should_profile(self, headers) -> bool:
+        if headers.get(self.header, "").lower() in ("1", "true", "yes"):
+            return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self) -> Optional[cProfile.Profile]:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already active on this thread
+            return None
+        return profiler
+
+    def stop(self, profiler: cProfile.Profile, label: str) -> Optional[str]:
+        """Stop profiling and write the stats; returns the file path"""
+        profiler.disable()
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            safe_label = "".join(c if c.isalnum() or c in "-_" else "_" for c in label)
+            filename = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{safe_label}.prof"
+            path = os.path.join(self.output_dir, filename)
+            profiler.dump_stats(path)
+            return path
+        except OSError as e:
+            self.logger.error(f"Error writing profile for {label}: {str(e)}")
+            return None
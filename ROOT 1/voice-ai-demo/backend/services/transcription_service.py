@@ -1,7 +1,10 @@
+from tracing import traced
+
 class TranscriptionService:
     def __init__(self, model):
         self.model = model
 
+    @traced()
     def transcribe_audio(self, audio_file_path):
         """
         Transcribes the audio file located at audio_file_path using the specified model.
@@ -15,14 +18,16 @@ class TranscriptionService:
         
         return transcribed_text
 
+    @traced()
     def load_audio(self, audio_file_path):
         """
         Loads the audio file from the specified path.
-        Returns the audio data.
+        Returns the audio data, or the path itself for models that load files.
         """
-        # Implement audio loading logic here
-        pass
+        # whisper decodes and resamples audio files itself, so the path is passed through
+        return audio_file_path
 
+    @traced()
     def save_transcription(self, transcription, output_file_path):
         """
         Saves the transcribed text to the specified output file.
@@ -0,0 +1,38 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+# Services import each other by module name, as app.py arranges
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services"))
+
+@pytest.fixture
+def db_session():
+    """Session on an in-memory SQLite database with 50 transcriptions mentioning "budget" """
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from models import Base, AudioFile, Transcription
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    start = datetime(2024, 1, 1)
+    for i in range(50):
+        audio = AudioFile(filename=f"recording_{i}.wav", file_path=f"/tmp/recording_{i}.wav",
+                          duration=i * 10, format="wav", created_at=start)
+        session.add(audio)
+        session.flush()
+        # Several rows share a created_at so paging has to break ties on id
+        session.add(Transcription(
+            audio_file_id=audio.id,
+            text=("budget review meeting" if i % 3 == 0 else "budget notes") + f" number {i}",
+            language="en",
+            confidence_score=i / 50,
+            created_at=start + timedelta(hours=i % 7)
+        ))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
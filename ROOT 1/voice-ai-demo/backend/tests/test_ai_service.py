@@ -0,0 +1,182 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from ai_service import AIService
+from tracing import TRACING_ENABLED, registry
+
+@pytest.fixture
+def ai(db_session):
+    return AIService(db_session, model_type="local")
+
+@pytest.mark.parametrize("recording_id, filename", [
+    ("3", "recording_2.wav"),
+    ("13", "recording_12.wav"),
+    ("recording_7", "recording_7.wav"),
+    ("recording_7.wav", "recording_7.wav")
+])
+def test_recordings_are_found_by_id_or_exact_filename(ai, recording_id, filename):
+    result = ai.summarize_recording(recording_id)
+    assert result["success"]
+    assert result["filename"] == filename
+
+@pytest.mark.parametrize("recording_id", ["999", "wav", "recording_", "recording_%"])
+def test_partial_filenames_do_not_match(ai, recording_id):
+    result = ai.summarize_recording(recording_id)
+    assert not result["success"]
+    assert result["error"] == f"Recording {recording_id} not found"
+
+class _CannedQA:
+    """Stands in for qa_batcher, answering each passage with a canned result"""
+
+    def __init__(self, results):
+        self.results = results
+
+    def map(self, items, **kwargs):
+        return [self.results[item["context"]] for item in items]
+
+def _passage(source_id, text, offset=0):
+    return {"source_id": source_id, "offset": offset, "text": text}
+
+def test_answers_agreeing_across_passages_add_up(ai):
+    ai.qa_batcher = _CannedQA({
+        "one": {"answer": "March 15", "score": 0.3, "start": 4},
+        "two": {"answer": "march 15.", "score": 0.35, "start": 9},
+        "three": {"answer": "April", "score": 0.5, "start": 0}
+    })
+    answer = ai._answer_from_passages("When?", [_passage(1, "one"), _passage(2, "two", 100), _passage(3, "three")])
+
+    assert answer["supporting_passages"] == 2
+    assert answer["score"] == pytest.approx(0.65)
+    # Source and offset come from the best scoring span of the winning answer
+    assert (answer["answer"], answer["transcription_id"], answer["offset"]) == ("march 15.", 2, 109)
+
+def test_same_span_in_overlapping_passages_counts_once(ai):
+    ai.qa_batcher = _CannedQA({
+        "first window": {"answer": "Erin", "score": 0.4, "start": 10},
+        "second window": {"answer": "Erin", "score": 0.45, "start": 5},
+        "other": {"answer": "Bob", "score": 0.6, "start": 0}
+    })
+    # Both windows point at character 10 of transcription 1
+    answer = ai._answer_from_passages("Who?", [
+        _passage(1, "first window"), _passage(1, "second window", 5), _passage(2, "other")
+    ])
+    assert answer["answer"] == "Bob"
+
+@pytest.mark.skipif(not TRACING_ENABLED, reason="TRACING_ENABLED=0")
+def test_answering_is_traced(ai):
+    ai.qa_batcher = _CannedQA({"text": {"answer": "Erin", "score": 0.9, "start": 0}})
+    before = registry.snapshot().get("AIService._answer_from_passages", {}).get("count", 0)
+    ai._answer_from_passages("Who?", [_passage(1, "text")])
+    assert registry.snapshot()["AIService._answer_from_passages"]["count"] == before + 1
+
+def test_no_answers(ai):
+    ai.qa_batcher = _CannedQA({"text": {"answer": " ", "score": 0.9, "start": 0}})
+    assert ai._answer_from_passages("Who?", [_passage(1, "text")]) is None
+    assert ai._answer_from_passages("Who?", []) is None
+
+def test_query_coalescing_key_only_ignores_case(ai):
+    keys = []
+
+    class RecordingFlight:
+        def do(self, key, fn):
+            keys.append(key)
+            return {}
+
+    ai.single_flight = RecordingFlight()
+    ai.process_query("Budget Review")
+    ai.process_query("budget review")
+    ai.process_query("budget  review")
+    assert keys[0] == keys[1]
+    # Spacing changes which rows the phrase match finds, so it must not coalesce
+    assert keys[1] != keys[2]
+
+@pytest.fixture
+def rolling_ai(ai):
+    """AIService whose map-reduce summarizer records how many words each map call read"""
+    from summarization import MapReduceSummarizer
+
+    mapped = []
+
+    def map_fn(chunks):
+        mapped.append(sum(len(chunk.split()) for chunk in chunks))
+        return [chunk.split()[0] for chunk in chunks]
+
+    ai.map_reduce_summarizer = MapReduceSummarizer(
+        map_fn, lambda text, summary_type: f"{summary_type}: {' '.join(text.split())}",
+        chunk_words=10, reduce_input_tokens=1000, namespace="test"
+    )
+    ai.mapped = mapped
+    return ai
+
+def _words(prefix, count):
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+def _rolling_summary(ai, transcription, summary_type="brief"):
+    result = ai.summarize_recording(str(transcription.audio_file_id), summary_type, incremental=True)
+    assert result["success"], result
+    return result
+
+def test_rolling_summary_reads_only_new_text(rolling_ai, db_session):
+    from models import Transcription
+
+    transcription = db_session.get(Transcription, 1)
+    transcription.text = _words("a", 35)
+    db_session.commit()
+
+    first = _rolling_summary(rolling_ai, transcription)
+    assert first["incremental"]["mode"] == "full"
+    # Complete chunks are mapped; the last one is kept as the tail
+    assert rolling_ai.mapped == [30]
+    assert first["summary"] == "brief: a0 a10 a20 a30 a31 a32 a33 a34"
+
+    assert _rolling_summary(rolling_ai, transcription)["incremental"] == {"mode": "unchanged", "new_chars": 0}
+    assert rolling_ai.mapped == [30]
+
+    transcription.text += " " + _words("b", 10)
+    db_session.commit()
+    delta = _rolling_summary(rolling_ai, transcription)
+    assert delta["incremental"]["mode"] == "delta"
+    assert delta["incremental"]["new_chars"] == len(" " + _words("b", 10))
+    # Only the old tail plus the new words went through the map phase
+    assert rolling_ai.mapped == [30, 10]
+    assert delta["summary"] == "brief: a0 a10 a20 a30 b5 b6 b7 b8 b9"
+
+def test_other_summary_types_reuse_the_partials(rolling_ai, db_session):
+    from models import Transcription
+
+    transcription = db_session.get(Transcription, 1)
+    transcription.text = _words("a", 35)
+    db_session.commit()
+
+    _rolling_summary(rolling_ai, transcription, "brief")
+    detailed = _rolling_summary(rolling_ai, transcription, "detailed")
+    assert detailed["summary"] == "detailed: a0 a10 a20 a30 a31 a32 a33 a34"
+    assert rolling_ai.mapped == [30]
+
+def test_edited_text_is_summarized_again(rolling_ai, db_session):
+    from models import AIAnalysis, Transcription
+
+    transcription = db_session.get(Transcription, 1)
+    transcription.text = _words("a", 35)
+    db_session.commit()
+    _rolling_summary(rolling_ai, transcription)
+
+    transcription.text = "edited " + transcription.text
+    db_session.commit()
+    result = _rolling_summary(rolling_ai, transcription)
+    assert result["incremental"]["mode"] == "full"
+    assert result["summary"].startswith("brief: edited a9")
+    # One state row per transcription, updated in place
+    assert db_session.query(AIAnalysis).filter(AIAnalysis.transcription_id == 1).count() == 1
+
+def test_state_from_another_model_is_ignored(rolling_ai, db_session):
+    from models import Transcription
+
+    transcription = db_session.get(Transcription, 1)
+    transcription.text = _words("a", 35)
+    db_session.commit()
+    _rolling_summary(rolling_ai, transcription)
+
+    rolling_ai.map_reduce_summarizer.namespace = "other"
+    assert _rolling_summary(rolling_ai, transcription)["incremental"]["mode"] == "full"
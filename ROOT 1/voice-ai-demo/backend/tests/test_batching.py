@@ -0,0 +1,124 @@
+import threading
+
+import pytest
+
+from batching import MicroBatcher
+
+def test_concurrent_calls_share_a_batch():
+    seen = []
+
+    def batch_fn(items):
+        seen.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=200)
+    try:
+        assert batcher.map(list(range(5))) == [0, 2, 4, 6, 8]
+    finally:
+        batcher.close()
+    assert seen == [[0, 1, 2, 3, 4]]
+    assert batcher.stats()["batches"] == 1
+
+def test_batches_are_capped_at_max_batch_size():
+    sizes = []
+
+    def batch_fn(items):
+        sizes.append(len(items))
+        return items
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait_ms=200)
+    try:
+        assert batcher.map(list(range(7))) == list(range(7))
+    finally:
+        batcher.close()
+    assert max(sizes) <= 3
+    assert sum(sizes) == 7
+
+def test_items_with_different_kwargs_get_separate_calls():
+    calls = []
+
+    def batch_fn(items, scale=1):
+        calls.append((tuple(items), scale))
+        return [item * scale for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=200)
+    try:
+        first = batcher.submit(1, scale=10)
+        second = batcher.submit(2, scale=100)
+        third = batcher.submit(3, scale=10)
+        assert [first.result(), second.result(), third.result()] == [10, 200, 30]
+    finally:
+        batcher.close()
+    assert sorted(calls) == [((1, 3), 10), ((2,), 100)]
+
+def test_batch_error_only_fails_the_bad_item():
+    calls = []
+
+    def batch_fn(items):
+        calls.append(list(items))
+        if None in items:
+            raise ValueError("empty question")
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=200)
+    try:
+        futures = [batcher.submit(item) for item in (1, None, 3)]
+        assert futures[0].result(timeout=5) == 2
+        with pytest.raises(ValueError, match="empty question"):
+            futures[1].result(timeout=5)
+        assert futures[2].result(timeout=5) == 6
+    finally:
+        batcher.close()
+    # One failed batch call, then one call per item
+    assert calls == [[1, None, 3], [1], [None], [3]]
+
+def test_error_reaches_every_caller_when_every_item_fails():
+    def batch_fn(items):
+        raise ValueError("model failed")
+
+    batcher = MicroBatcher(batch_fn, max_batch_size=8, max_wait_ms=200)
+    try:
+        futures = [batcher.submit(i) for i in range(4)]
+        for future in futures:
+            with pytest.raises(ValueError, match="model failed"):
+                future.result(timeout=5)
+        # The worker keeps serving after a failed batch
+        batcher.batch_fn = lambda items: items
+        assert batcher(7) == 7
+    finally:
+        batcher.close()
+
+def test_wrong_number_of_results_fails_the_batch():
+    batcher = MicroBatcher(lambda items: items[:1], max_batch_size=8, max_wait_ms=200)
+    try:
+        futures = [batcher.submit(i) for i in range(3)]
+        # Retried one at a time, each item gets its own result
+        assert [future.result(timeout=5) for future in futures] == [0, 1, 2]
+        batcher.batch_fn = lambda items: []
+        with pytest.raises(RuntimeError, match="returned 0 results for 1 items"):
+            batcher(5)
+    finally:
+        batcher.close()
+
+def test_submit_after_close_is_rejected():
+    batcher = MicroBatcher(lambda items: items)
+    batcher.close()
+    with pytest.raises(RuntimeError):
+        batcher.submit(1)
+
+def test_results_go_back_to_the_submitting_thread():
+    batcher = MicroBatcher(lambda items: [item + 1 for item in items], max_batch_size=4, max_wait_ms=20)
+    results = {}
+
+    def call(i):
+        results[i] = batcher(i)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(20)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        batcher.close()
+    assert results == {i: i + 1 for i in range(20)}
@@ -0,0 +1,63 @@
+import pytest
+
+from context_packer import MAX_CONTEXT_TOKENS, ContextPacker, context_budget, estimate_tokens
+
+def _passage(text, score, source_id=0):
+    return {"source_id": source_id, "offset": 0, "text": text, "tokens": estimate_tokens(text), "score": score}
+
+def _words(prefix, count):
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+def test_pack_stays_within_budget_and_prefers_high_scores():
+    packer = ContextPacker()
+    passages = [_passage(_words(name, 40), score) for name, score in (("a", 0.2), ("b", 0.9), ("c", 0.5))]
+    budget = passages[0]["tokens"] * 2
+
+    packed = packer.pack(passages, budget)
+    assert [p["score"] for p in packed] == [0.9, 0.5]
+    assert sum(p["tokens"] for p in packed) <= budget
+
+def test_pack_skips_passages_too_large_for_the_remaining_budget():
+    packer = ContextPacker()
+    large, small = _passage(_words("big", 200), 0.9), _passage(_words("small", 10), 0.1)
+    packed = packer.pack([large, small], small["tokens"] + 5)
+    assert packed == [small]
+
+def test_pack_drops_near_duplicates():
+    packer = ContextPacker()
+    text = _words("w", 60)
+    original = _passage(text, 0.9, source_id=1)
+    repeated = _passage(text, 0.8, source_id=2)
+    contained = _passage(" ".join(text.split()[10:40]), 0.7, source_id=3)
+    distinct = _passage(_words("x", 60), 0.1, source_id=4)
+
+    packed = packer.pack([original, repeated, contained, distinct], 10000)
+    assert [p["source_id"] for p in packed] == [1, 4]
+
+def test_split_passages_overlap_and_offsets():
+    packer = ContextPacker(passage_words=10, overlap_words=2)
+    text = _words("w", 25)
+    passages = packer.split_passages("doc", text)
+
+    assert [len(p["text"].split()) for p in passages] == [10, 10, 9]
+    assert passages[1]["text"].split()[:2] == passages[0]["text"].split()[-2:]
+    for passage in passages:
+        assert text[passage["offset"]:].startswith(passage["text"])
+
+def test_overlap_must_be_smaller_than_passage():
+    with pytest.raises(ValueError):
+        ContextPacker(passage_words=10, overlap_words=10)
+
+def test_pack_sources_ranks_by_query_terms():
+    packer = ContextPacker()
+    texts = ["the weather was nice", "the budget was approved by finance", "lunch plans"]
+    assert packer.pack_texts("budget approved", texts, 1000)[0] == texts[1]
+
+def test_context_budget():
+    assert context_budget("gpt-3.5-turbo", 1000) == 4096 - 1000 - 300
+    assert context_budget("gpt-4o", 500) == MAX_CONTEXT_TOKENS
+    assert context_budget("gpt-3.5-turbo", 5000) == 0
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert 90 <= estimate_tokens(_words("word", 75)) <= 140
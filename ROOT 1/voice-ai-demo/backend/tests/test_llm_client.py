@@ -0,0 +1,141 @@
+import time
+
+import pytest
+
+from llm_client import CircuitBreaker, CircuitOpenError, LLMError, LocalLimitTimeout, TokenBucket
+
+def _open_breaker(reset_timeout=0.05):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=reset_timeout)
+    breaker.record_failure()
+    breaker.record_failure()
+    return breaker
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+def test_half_open_lets_one_trial_through():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    # Only one trial at a time while it is in flight
+    assert not breaker.allow()
+
+def test_half_open_trial_success_closes_the_circuit():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+def test_half_open_trial_failure_reopens_the_circuit():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+def test_released_trial_frees_the_half_open_slot():
+    breaker = _open_breaker()
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+def test_token_bucket_limits_bursts():
+    bucket = TokenBucket(rate=1, capacity=2)
+    assert bucket.acquire(timeout=0) and bucket.acquire(timeout=0)
+    assert not bucket.acquire(timeout=0.01)
+
+def test_token_bucket_disabled_at_zero_rate():
+    bucket = TokenBucket(rate=0, capacity=1)
+    assert all(bucket.acquire(timeout=0) for _ in range(100))
+
+class _Response:
+    def __init__(self, status_code, body=None):
+        self.status_code = status_code
+        self._body = body or {}
+        self.text = ""
+        self.headers = {}
+
+    def json(self):
+        return self._body
+
+@pytest.fixture
+def client():
+    pytest.importorskip("requests")
+    from llm_client import LLMClient
+    client = LLMClient("test-key", base_url="http://127.0.0.1:9", timeout=1, max_retries=0,
+                       failure_threshold=2, reset_timeout=0.05)
+    yield client
+    client.close()
+
+def _reply(client, monkeypatch, *responses):
+    replies = list(responses)
+
+    def send(path, payload, deadline):
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(client, "_send", send)
+
+def test_client_opens_and_recovers_through_half_open(client, monkeypatch):
+    ok = _Response(200, {"choices": [{"message": {"content": " hello "}}]})
+    _reply(client, monkeypatch, _Response(503), _Response(503), ok)
+    for _ in range(2):
+        with pytest.raises(LLMError):
+            client.chat([{"role": "user", "content": "hi"}], model="test")
+    with pytest.raises(CircuitOpenError):
+        client.chat([{"role": "user", "content": "hi"}], model="test")
+
+    time.sleep(0.06)
+    assert client.chat([{"role": "user", "content": "hi"}], model="test") == "hello"
+    assert client.stats()["circuit"] == "closed"
+
+def test_client_errors_do_not_open_the_circuit(client, monkeypatch):
+    _reply(client, monkeypatch, *[_Response(400)] * 3)
+    for _ in range(3):
+        with pytest.raises(LLMError) as error:
+            client.chat([{"role": "user", "content": "hi"}], model="test")
+        assert error.value.status == 400
+    assert client.stats()["circuit"] == "closed"
+
+def test_local_limit_timeouts_do_not_count_against_the_breaker(client, monkeypatch):
+    _reply(client, monkeypatch, *[LocalLimitTimeout("queued too long")] * 3)
+    for _ in range(3):
+        with pytest.raises(LocalLimitTimeout):
+            client.chat([{"role": "user", "content": "hi"}], model="test")
+    assert client.breaker.failures == 0
+    assert client.stats()["circuit"] == "closed"
+    assert client.stats()["failures"] == 3
+
+def test_local_timeout_on_a_retry_reports_the_provider_error(client, monkeypatch):
+    client.max_retries = 1
+    client.backoff_base = 0.001
+    _reply(client, monkeypatch, _Response(503), LocalLimitTimeout("queued too long"),
+           _Response(503), LocalLimitTimeout("queued too long"))
+    for _ in range(2):
+        with pytest.raises(LLMError) as error:
+            client.chat([{"role": "user", "content": "hi"}], model="test")
+        assert not isinstance(error.value, LocalLimitTimeout)
+        assert error.value.status == 503
+    # Both provider failures counted, so the circuit opened
+    assert client.stats()["circuit"] == "open"
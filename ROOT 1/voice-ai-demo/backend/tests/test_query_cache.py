@@ -0,0 +1,58 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from models import Transcription
+from query_cache import QueryCache
+from search_service import SearchService
+
+def test_search_results_are_served_from_cache(db_session):
+    service = SearchService(db_session, cache=QueryCache())
+    first = service.advanced_search("budget", {"limit": 5})
+    second = service.advanced_search("budget", {"limit": 5})
+    assert [t.id for t in second["results"]] == [t.id for t in first["results"]]
+    assert "ids" not in second
+    assert service.cache.stats()["hits"] == 1
+
+def test_committed_insert_invalidates_cached_results(db_session):
+    service = SearchService(db_session, cache=QueryCache())
+    assert service.search_transcriptions("quarterly") == []
+
+    db_session.add(Transcription(audio_file_id=1, text="quarterly forecast", language="en"))
+    db_session.commit()
+
+    assert [t.text for t in service.search_transcriptions("quarterly")] == ["quarterly forecast"]
+
+def test_committed_update_invalidates_cached_page(db_session):
+    service = SearchService(db_session, cache=QueryCache())
+    before = service.advanced_search("budget", {"limit": 100})
+
+    row = db_session.get(Transcription, before["results"][0].id)
+    row.text = "renamed"
+    db_session.commit()
+
+    after = service.advanced_search("budget", {"limit": 100})
+    assert row.id not in [t.id for t in after["results"]]
+    assert len(after["results"]) == len(before["results"]) - 1
+
+def test_commit_invalidates_again_after_recaching(db_session):
+    cache = QueryCache()
+    key = cache.make_key("test", "budget")
+    tables = (Transcription.__tablename__,)
+
+    db_session.add(Transcription(audio_file_id=1, text="budget draft", language="en"))
+    db_session.flush()
+    # Another reader caches between the flush and the commit
+    cache.set(key, cache.generation(tables), ["stale"], 1)
+    assert cache.get(key, tables) == ["stale"]
+
+    db_session.commit()
+    assert cache.get(key, tables) is None
+
+def test_lru_evicts_oldest_entry():
+    cache = QueryCache(max_entries=2)
+    tables = (Transcription.__tablename__,)
+    for name in ("a", "b", "c"):
+        cache.set(cache.make_key("test", name), cache.generation(tables), [name], 1)
+    assert cache.get(cache.make_key("test", "a"), tables) is None
+    assert cache.get(cache.make_key("test", "c"), tables) == ["c"]
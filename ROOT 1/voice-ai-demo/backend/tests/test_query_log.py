@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from models import SearchQuery
+from query_log import latency_report, profile_query
+
+def _log(session, source, execution_time, created_at=None, **stages):
+    session.add(SearchQuery(
+        query_text="budget", source=source, execution_time=execution_time,
+        db_time=stages.get("db", 0.0), ranking_time=stages.get("ranking", 0.0),
+        llm_time=stages.get("llm", 0.0), serialization_time=stages.get("serialization", 0.0),
+        created_at=created_at or datetime.utcnow()
+    ))
+
+def test_nearest_rank_percentiles(db_session):
+    for i in range(1, 101):
+        _log(db_session, "search.advanced_search", i / 100, db=i / 100)
+    db_session.commit()
+
+    report = latency_report(db_session)
+    assert report["query_count"] == 100
+    assert report["execution_time"] == {"count": 100, "p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+def test_stage_percentiles_skip_queries_without_the_stage(db_session):
+    for i in range(1, 91):
+        _log(db_session, "search.advanced_search", 0.01, db=0.01)
+    for i in range(1, 11):
+        _log(db_session, "ai.process_query", i, db=0.01, llm=i)
+    db_session.commit()
+
+    stages = latency_report(db_session)["stages"]
+    assert stages["llm"] == {"count": 10, "p50": 5, "p95": 10, "p99": 10}
+    assert stages["db"]["count"] == 100
+    assert stages["ranking"] == {"count": 0, "p50": None, "p95": None, "p99": None}
+
+def test_report_filters_by_source_and_time(db_session):
+    _log(db_session, "search.advanced_search", 1.0, created_at=datetime.utcnow() - timedelta(hours=2))
+    _log(db_session, "search.advanced_search", 2.0)
+    _log(db_session, "ai.process_query", 3.0, llm=3.0)
+    db_session.commit()
+
+    report = latency_report(db_session, since=datetime.utcnow() - timedelta(hours=1),
+                            source="search.advanced_search")
+    assert report["query_count"] == 1
+    assert [q["execution_time"] for q in report["slowest_queries"]] == [2.0]
+
+def test_empty_report(db_session):
+    report = latency_report(db_session)
+    assert report["query_count"] == 0
+    assert report["execution_time"]["p99"] is None
+
+def test_nested_profiles_log_one_record():
+    class Writer:
+        def __init__(self):
+            self.records = []
+
+        def submit(self, record):
+            self.records.append(record)
+
+    writer = Writer()
+    with profile_query("budget", "route", writer=writer) as outer:
+        with outer.stage("db"):
+            with profile_query("budget", "service") as inner:
+                assert inner is outer
+    assert len(writer.records) == 1
+    assert writer.records[0]["source"] == "route"
+    assert writer.records[0]["db_time"] > 0
@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from search_service import SearchService
+
+def _all_pages(service, query, filters):
+    pages, cursor = [], None
+    while True:
+        page = service.advanced_search(query, dict(filters, cursor=cursor))
+        pages.append([t.id for t in page["results"]])
+        if not page["has_more"]:
+            assert page["next_cursor"] is None
+            return pages
+        cursor = page["next_cursor"]
+
+@pytest.mark.parametrize("sort", ["relevance", "recency"])
+@pytest.mark.parametrize("cached", [False, True])
+def test_keyset_paging_visits_every_row_once(db_session, sort, cached):
+    service = SearchService(db_session, cache=None)
+    if cached:
+        from query_cache import QueryCache
+        service.cache = QueryCache()
+
+    pages = _all_pages(service, "budget", {"sort": sort, "limit": 7})
+    ids = [row_id for page in pages for row_id in page]
+
+    assert len(pages) == 8
+    assert all(len(page) == 7 for page in pages[:-1])
+    assert len(ids) == len(set(ids)) == 50
+
+def test_paging_matches_a_single_page(db_session):
+    service = SearchService(db_session, cache=None)
+    everything = [t.id for t in service.advanced_search("budget", {"sort": "recency", "limit": 100})["results"]]
+    paged = [row_id for page in _all_pages(service, "budget", {"sort": "recency", "limit": 6}) for row_id in page]
+    assert paged == everything
+
+def test_cursor_from_another_sort_is_rejected(db_session):
+    service = SearchService(db_session, cache=None)
+    cursor = service.advanced_search("budget", {"sort": "recency", "limit": 5})["next_cursor"]
+    with pytest.raises(ValueError):
+        service.advanced_search("budget", {"sort": "relevance", "limit": 5, "cursor": cursor})
+
+def test_invalid_cursor_is_rejected(db_session):
+    service = SearchService(db_session, cache=None)
+    with pytest.raises(ValueError):
+        service.advanced_search("budget", {"cursor": "not-a-cursor"})
@@ -0,0 +1,86 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+def _run_concurrently(flight, key, fn, callers):
+    """Start callers threads running flight.do(key, fn), recording each result or exception"""
+    outcomes = [None] * callers
+
+    def call(i):
+        try:
+            outcomes[i] = ("ok", flight.do(key, fn))
+        except Exception as e:
+            outcomes[i] = ("error", e)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    return threads, outcomes
+
+def _wait_for_shared(flight, count):
+    # Followers are counted as shared once they found the leader's future
+    deadline = time.monotonic() + 5
+    while flight.stats()["shared"] < count:
+        assert time.monotonic() < deadline, "followers never joined the call in flight"
+        time.sleep(0.001)
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"answer": 42}
+
+    threads, outcomes = _run_concurrently(flight, "key", fn, 1)
+    assert started.wait(5)
+    followers, follower_outcomes = _run_concurrently(flight, "key", fn, 4)
+    _wait_for_shared(flight, 4)
+    release.set()
+    for thread in threads + followers:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(outcome == ("ok", {"answer": 42}) for outcome in outcomes + follower_outcomes)
+    assert flight.stats() == {"calls": 5, "shared": 4, "in_flight": 0}
+
+def test_leader_exception_reaches_followers():
+    flight = SingleFlight("test")
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("provider down")
+
+    threads, outcomes = _run_concurrently(flight, "key", fn, 1)
+    assert started.wait(5)
+    followers, follower_outcomes = _run_concurrently(flight, "key", fn, 3)
+    _wait_for_shared(flight, 3)
+    release.set()
+    for thread in threads + followers:
+        thread.join()
+
+    for status, error in outcomes + follower_outcomes:
+        assert status == "error"
+        assert isinstance(error, RuntimeError) and str(error) == "provider down"
+    # A failed call is not remembered; the next caller runs fn again
+    assert flight.do("key", lambda: "recovered") == "recovered"
+
+def test_callers_get_independent_copies():
+    flight = SingleFlight("test")
+    first = flight.do("key", lambda: {"items": [1]})
+    first["items"].append(2)
+    assert flight.do("key", lambda: {"items": [1]}) == {"items": [1]}
+
+def test_exception_in_leader_is_raised_to_it():
+    flight = SingleFlight("test")
+    with pytest.raises(KeyError):
+        flight.do("key", lambda: {}["missing"])
+    assert flight.stats()["in_flight"] == 0
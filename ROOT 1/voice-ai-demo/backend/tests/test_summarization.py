@@ -0,0 +1,64 @@
+from context_packer import estimate_tokens
+from summarization import ChunkSummaryCache, MapReduceSummarizer
+
+def _words(prefix, count):
+    return " ".join(f"{prefix}{i}" for i in range(count))
+
+def _summarizer(map_fn=None, reduce_input_tokens=200, chunk_words=50, cache=None):
+    calls = []
+
+    def default_map(chunks):
+        calls.append(len(chunks))
+        # Keep the first fifth of every chunk
+        return [" ".join(chunk.split()[:max(1, len(chunk.split()) // 5)]) for chunk in chunks]
+
+    summarizer = MapReduceSummarizer(
+        map_fn or default_map, lambda text, summary_type: f"{summary_type}: {text}",
+        chunk_words=chunk_words, reduce_input_tokens=reduce_input_tokens, cache=cache, namespace="test"
+    )
+    return summarizer, calls
+
+def test_short_text_skips_the_map_phase():
+    summarizer, calls = _summarizer()
+    assert summarizer.summarize("short transcription", "brief") == "brief: short transcription"
+    assert calls == []
+
+def test_long_text_is_mapped_then_reduced():
+    summarizer, calls = _summarizer()
+    condensed = summarizer.condense(_words("w", 500))
+    assert calls == [10]
+    assert estimate_tokens(condensed) <= summarizer.reduce_input_tokens
+    assert condensed.split("\n")[1].startswith("w50 ")
+
+def test_condense_stays_within_budget_when_summaries_do_not_shrink():
+    # A map_fn that never shortens its input exhausts MAX_REDUCE_DEPTH
+    summarizer, _ = _summarizer(map_fn=lambda chunks: list(chunks))
+    condensed = summarizer.condense(_words("w", 2000))
+    assert estimate_tokens(condensed) <= summarizer.reduce_input_tokens
+
+def test_fit_trims_every_part_proportionally():
+    summarizer, _ = _summarizer()
+    parts = [_words(name, 100) for name in ("a", "b", "c")]
+    fitted = summarizer.fit(parts).split("\n")
+    assert estimate_tokens("\n".join(fitted)) <= summarizer.reduce_input_tokens
+    # Every part keeps its head, so the whole recording stays represented
+    assert [line.split()[0] for line in fitted] == ["a0", "b0", "c0"]
+    assert len({len(line.split()) for line in fitted}) == 1
+
+def test_fit_returns_text_within_budget_unchanged():
+    summarizer, _ = _summarizer()
+    assert summarizer.fit(["one", "two"]) == "one\ntwo"
+
+def test_fit_keeps_the_head_when_parts_outnumber_the_budget():
+    summarizer, _ = _summarizer(reduce_input_tokens=20)
+    fitted = summarizer.fit([_words(f"p{i}_", 5) for i in range(100)])
+    assert fitted.startswith("p0_0")
+    assert estimate_tokens(fitted) <= 20
+
+def test_chunk_summaries_are_cached_across_summary_types():
+    summarizer, calls = _summarizer(cache=ChunkSummaryCache())
+    text = _words("w", 500)
+    brief = summarizer.summarize(text, "brief")
+    detailed = summarizer.summarize(text, "detailed")
+    assert calls == [10]
+    assert brief[len("brief: "):] == detailed[len("detailed: "):]
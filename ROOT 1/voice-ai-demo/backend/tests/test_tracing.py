@@ -0,0 +1,59 @@
+import pytest
+
+from tracing import TRACING_ENABLED, MetricsRegistry, registry, span, traced
+
+def _samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+def test_buckets_are_cumulative_with_inclusive_bounds():
+    metrics = MetricsRegistry(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.1, 0.5, 2.0):
+        metrics.observe("search", seconds)
+
+    samples = _samples(metrics.render_prometheus())
+    assert samples['span_duration_seconds_bucket{span="search",le="0.1"}'] == "2"
+    assert samples['span_duration_seconds_bucket{span="search",le="1.0"}'] == "3"
+    assert samples['span_duration_seconds_bucket{span="search",le="+Inf"}'] == "4"
+    assert samples['span_duration_seconds_count{span="search"}'] == "4"
+    assert float(samples['span_duration_seconds_sum{span="search"}']) == pytest.approx(2.65)
+
+def test_exposition_format():
+    metrics = MetricsRegistry(buckets=(1.0,))
+    metrics.observe("b", 0.5, error=True)
+    metrics.observe("a", 0.5)
+
+    text = metrics.render_prometheus()
+    assert text.endswith("\n")
+    lines = text.splitlines()
+    assert lines[:2] == [
+        "# HELP span_duration_seconds Duration of instrumented spans",
+        "# TYPE span_duration_seconds histogram"
+    ]
+    assert "# TYPE span_errors_total counter" in lines
+    # Spans are rendered in name order
+    assert lines.index('span_duration_seconds_count{span="a"} 1') < lines.index('span_duration_seconds_count{span="b"} 1')
+    assert 'span_errors_total{span="a"} 0' in lines
+    assert 'span_errors_total{span="b"} 1' in lines
+
+def test_label_values_are_escaped():
+    metrics = MetricsRegistry(buckets=(1.0,))
+    metrics.observe('say "hi"\\\n', 0.5)
+    assert 'span="say \\"hi\\"\\\\\\n"' in metrics.render_prometheus()
+
+def test_empty_registry_renders_headers_only():
+    assert _samples(MetricsRegistry().render_prometheus()) == {}
+
+@pytest.mark.skipif(not TRACING_ENABLED, reason="TRACING_ENABLED=0")
+def test_span_and_traced_record_errors():
+    @traced("test_tracing.fails")
+    def fails():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        fails()
+    with span("test_tracing.block"):
+        pass
+
+    snapshot = registry.snapshot()
+    assert snapshot["test_tracing.fails"]["errors"] >= 1
+    assert snapshot["test_tracing.block"]["count"] >= 1
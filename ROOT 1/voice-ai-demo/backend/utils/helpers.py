@@ -1,4 +1,5 @@
-from typing import Any, Dict, List
+import json
+from typing import Any, Callable, Dict, Iterable, Iterator, List
 
 def format_duration(seconds: float) -> str:
     if seconds < 60:
@@ -36,4 +37,20 @@ def handle_error(message: str) -> Dict[str, Any]:
     return {
         "status": "error",
         "message": message
-    }
\ No newline at end of file
+    }
+
+def serialize_transcription(transcription: Any) -> Dict[str, Any]:
+    return {
+        "id": transcription.id,
+        "audio_file_id": transcription.audio_file_id,
+        "text": transcription.text,
+        "language": transcription.language,
+        "confidence_score": transcription.confidence_score,
+        "model_used": transcription.model_used,
+        "created_at": transcription.created_at.isoformat() if transcription.created_at else None
+    }
+
+def ndjson_lines(items: Iterable[Any], serializer: Callable[[Any], Dict[str, Any]]) -> Iterator[str]:
+    # One JSON document per line, serialized lazily as items are produced
+    for item in items:
+        yield json.dumps(serializer(item)) + "\n"